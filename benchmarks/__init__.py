@@ -0,0 +1,12 @@
+"""
+Benchmarks - benchmarks package
+-----------------------------------------------------------
+This package contains the benchmark runners of the game.
+They run the game objects without a window using the SDL
+dummy video driver and report the timings as JSON files.
+Run them from the project root, for example:
+    python -m benchmarks.scenarios
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
@@ -0,0 +1,106 @@
+"""
+Benchmark Helpers - common.py
+-----------------------------------------------------------
+This module contains the helper functions shared by the
+benchmark runners. It sets up pygame without a window and
+a leaderboard in a temporary folder, and has the functions
+to summarize the timings and to compare the results
+against a saved baseline file.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import contextlib
+import json
+import os
+import platform
+import tempfile
+from pathlib import Path
+
+# Use the SDL dummy drivers unless another driver is set
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+import pygame_gui  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.profiler import FrameProfiler  # noqa: E402
+
+# Folder of the files written by the bot runners (ignored by git)
+OUTPUT_DIR = Path(__file__).resolve().parent / "out"
+
+
+def setup_display():
+    """ Initializes pygame and returns the screen and the GUI manager. """
+    pygame.init()
+    screen = pygame.display.set_mode(Config.SCREEN_DIMENSIONS)
+    manager = pygame_gui.UIManager(Config.SCREEN_DIMENSIONS,
+                                   Config.theme_path())
+    return screen, manager
+
+
+def use_leaderboard_folder(folder, filename="leaderboard.db"):
+    """
+    Makes the new games save to a leaderboard file in the folder instead
+    of the real leaderboard of the game, and not import the old one.
+    """
+    Config.LEADERBOARD_PATH = str(Path(folder) / filename)
+    Config.LEADERBOARD_LEGACY_PATH = str(Path(folder) / "leaderboard.bin")
+
+
+@contextlib.contextmanager
+def temporary_leaderboard():
+    """
+    Uses a leaderboard in a temporary folder inside the context and
+    yields the folder. The games must be closed before it is removed.
+    """
+    previous = Config.LEADERBOARD_PATH, Config.LEADERBOARD_LEGACY_PATH
+    with tempfile.TemporaryDirectory(prefix="snake-bench-") as folder:
+        use_leaderboard_folder(folder)
+        try:
+            yield folder
+        finally:
+            (Config.LEADERBOARD_PATH,
+             Config.LEADERBOARD_LEGACY_PATH) = previous
+
+
+def summarize(values):
+    """ Returns the p50, p95 and p99 of the values in milliseconds. """
+    p50, p95, p99 = FrameProfiler.percentiles(values, 50, 95, 99)
+    return {"p50": round(p50, 4), "p95": round(p95, 4), "p99": round(p99, 4)}
+
+
+def machine_info():
+    """ Returns the machine details saved with every result file. """
+    return {"python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine()}
+
+
+def save_results(path, results):
+    """ Writes the results with the machine details to a JSON file. """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as result_file:
+        json.dump({"machine": machine_info(), "results": results},
+                  result_file, indent=2)
+
+
+def compare(results, baseline_path, *, metric, threshold):
+    """
+    Compares the metric of each result with the same result in the
+    baseline file. Returns the list of (name, key, old, new) of the
+    values that are slower than the baseline by more than threshold.
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    regressions = []
+    for name, result in results.items():
+        for key, values in result.items():
+            if not isinstance(values, dict) or metric not in values:
+                continue
+            old = baseline.get(name, {}).get(key, {}).get(metric)
+            if old and values[metric] > old * (1 + threshold):
+                regressions.append((name, key, old, values[metric]))
+    return regressions
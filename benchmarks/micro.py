@@ -0,0 +1,265 @@
+"""
+Micro Benchmarks - micro.py
+-----------------------------------------------------------
+This module times the hot functions of the game objects
+one by one with parametrized sizes (snake length, number
+of particles, bombs or leaderboard records). Each case is
+called in a loop until it runs long enough, and the best
+and median time per call of several rounds are reported.
+The results are printed and can be saved as a JSON file
+or compared against a previous result file.
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro Snake.rects --baseline micro.json
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import argparse
+import marshal
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+# The benchmark helpers select the SDL dummy driver before pygame loads
+from benchmarks.common import (setup_display, save_results, compare,
+                               temporary_leaderboard)
+import pygame
+from src.game import Game
+from src.leaderboard import Leaderboard
+from src.objects.bomb import Bomb
+from src.objects.food import Food
+from src.objects.particles import ParticleSystem
+from src.objects.snake import Snake, SnakePart
+
+
+# Benchmark settings (minimum seconds of each round)
+SEED = 2024
+TIME_DELTA = 1 / 60
+ROUND_TIME = 0.05
+REPEAT = 5
+
+# Benchmark name: (setup function, list of sizes)
+BENCHMARKS = {}
+
+
+def benchmark(name, sizes=(None,)):
+    """
+    Registers a setup function that receives the size and the shared
+    benchmark context, and returns the function that is timed.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, sizes)
+        return setup
+    return register
+
+
+@benchmark("SnakePart.update", sizes=(10, 100, 1000))
+def snake_part_update(size, context):
+    snake = Snake(background=context["background"], length=size + 1)
+    parts = snake.body
+
+    def run():
+        for part in parts:
+            part.update()
+    return run
+
+
+@benchmark("SnakePart._normalize_sprite")
+def snake_part_normalize_sprite(size, context):
+    part = SnakePart(512, 384, direction=Snake.LEFT,
+                     image=context["snake"].head.image)
+    return part._normalize_sprite
+
+
+@benchmark("Snake._create_turn_covers", sizes=(50, 500, 2000))
+def snake_create_turn_covers(size, context):
+    snake = Snake(background=context["background"], length=size)
+    return snake._create_turn_covers
+
+
+@benchmark("Snake.rects", sizes=(50, 500, 5000))
+def snake_rects(size, context):
+    snake = Snake(background=context["background"], length=size)
+    return lambda: snake.rects
+
+
+@benchmark("Particle.update", sizes=(7, 100, 1000))
+def particle_update(size, context):
+    image = pygame.Surface((50, 50), pygame.SRCALPHA)
+    particles = ParticleSystem(image=image, size=28, lifetime=0.8,
+                               count=size)
+    particles.spawn(pygame.Rect(400, 300, 40, 40))
+    return lambda: particles.update(TIME_DELTA)
+
+
+def spawned_bombs(count, context):
+    """ Returns the list of bombs that are spawned in the arena. """
+    bombs = [Bomb(damage=10, deduction=50, snake=context["snake"])
+             for _ in range(count)]
+    for bomb in bombs:
+        bomb._spawn_bomb()
+        bomb.update(Bomb.SCALE_TIME)
+    return bombs
+
+
+@benchmark("Bomb.update", sizes=(1, 10, 100))
+def bomb_update(size, context):
+    bombs = spawned_bombs(size, context)
+
+    def run():
+        for bomb in bombs:
+            bomb.update(TIME_DELTA)
+    return run
+
+
+@benchmark("Bomb.bounds", sizes=(1, 10, 100))
+def bomb_bounds(size, context):
+    bombs = spawned_bombs(size, context)
+    return lambda: [bomb.bounds for bomb in bombs]
+
+
+@benchmark("Food.spawn", sizes=(50, 500, 5000))
+def food_spawn(size, context):
+    snake = Snake(background=context["background"], length=size)
+    food = Food(filename="apple.png", points=10, regen=2)
+
+    def run():
+        # The game passes a new list of the territories on every spawn
+        food.spawn(off_limits_rects=list(snake.rects))
+    return run
+
+
+def filled_leaderboard(name, count, context):
+    """
+    Returns a new leaderboard of the game that is filled with count
+    random records from a legacy file. The name keeps the database
+    files of the benchmarks apart.
+    """
+    game = context["game"]
+    folder = Path(context["tempdir"])
+    legacy = folder / f"{name}_{count}.bin"
+    legacy.write_bytes(marshal.dumps([
+        {"name": f"PLAYER{i % 300}", "score": random.randint(0, 5000),
+         "stretch": random.randint(0, 100),
+         "lifetime": random.randint(0, 600)}
+        for i in range(count)
+    ]))
+    game.leaderboard.close()
+    game.leaderboard = Leaderboard(folder / f"{name}_{count}.db",
+                                   legacy_path=legacy)
+    return game.leaderboard
+
+
+@benchmark("Game.update_leaderboard_data", sizes=(1000, 10000))
+def game_update_leaderboard_data(size, context):
+    game = context["game"]
+    leaderboard = filled_leaderboard("update", size, context)
+
+    def run():
+        game.update_leaderboard_data()
+        # Wait for the commit, so the writer queue never overflows
+        leaderboard.flush()
+    return run
+
+
+@benchmark("Leaderboard.top (uncached)", sizes=(1000, 10000))
+def leaderboard_top_uncached(size, context):
+    leaderboard = filled_leaderboard("top", size, context)
+    # The pages past the cached top scores are read from the database
+    offset = size - Leaderboard.CACHE_SIZE
+
+    def run():
+        leaderboard.top(10, offset=offset)
+        leaderboard.rank(2500)
+    return run
+
+
+def measure(func):
+    """
+    Calls the function in rounds of at least ROUND_TIME seconds and
+    returns the number of calls of each round and the times per call.
+    """
+    def timed(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+
+    # Double the number of calls until a round is long enough
+    number = 1
+    while (elapsed := timed(number)) < ROUND_TIME:
+        number *= 2
+    times = [elapsed / number]
+    times += [timed(number) / number for _ in range(REPEAT - 1)]
+    return number, times
+
+
+def run_benchmarks(names):
+    """ Runs the benchmarks with each of their sizes and returns results. """
+    screen, manager = setup_display()
+    results = {}
+    # The leaderboard files of the benchmarks are in the temporary folder
+    with temporary_leaderboard() as tempdir:
+        random.seed(SEED)
+        game = Game(screen, manager)
+        context = {"game": game, "background": game.bgwalled,
+                   "snake": game.snake, "tempdir": tempdir}
+        try:
+            for name in names:
+                setup, sizes = BENCHMARKS[name]
+                results[name] = {}
+                for size in sizes:
+                    random.seed(SEED)
+                    number, times = measure(setup(size, context))
+                    key = "-" if size is None else str(size)
+                    median = statistics.median(times)
+                    results[name][key] = {
+                        "number": number,
+                        "min_us": round(min(times) * 1e6, 3),
+                        "median_us": round(median * 1e6, 3),
+                        "stdev_us": round(statistics.stdev(times) * 1e6, 3)
+                    }
+                    print(f"{name:<30} {key:>6} {median * 1e6:>12.3f} us")
+        finally:
+            game.leaderboard.close()
+    return results
+
+
+def parse_args(argv=None):
+    """ Parses the command line options of the micro benchmarks. """
+    parser = argparse.ArgumentParser(description="Run the micro benchmarks.")
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help="benchmarks to run (default: all), one of: "
+                             + ", ".join(BENCHMARKS))
+    parser.add_argument("--output", metavar="PATH",
+                        help="save the results as a JSON file")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed slowdown before a regression (0.1=10%%)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.benchmarks or list(BENCHMARKS))
+    if args.output:
+        save_results(args.output, results)
+    if not args.baseline:
+        return 0
+
+    # Compare the median time per call with the previous results
+    regressions = compare(results, args.baseline, metric="median_us",
+                          threshold=args.threshold)
+    for name, size, old, new in regressions:
+        print(f"REGRESSION {name} [{size}] median: {old:.3f} -> {new:.3f} us")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Scenario Benchmarks - scenarios.py
+-----------------------------------------------------------
+This module plays scripted scenarios of the whole Game
+without a window and reports the p50, p95 and p99 of the
+update and draw times of each frame, and the allocations
+made by each frame. The results can be saved as the
+baseline file and later runs are compared against it.
+    python -m benchmarks.scenarios --save-baseline
+    python -m benchmarks.scenarios --threshold 0.2
+The scenarios do not handle the timer events of the game,
+every spawn is done by the scenario itself so each run
+with the same seed plays the same frames.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+# The benchmark helpers select the SDL dummy driver before pygame loads
+from benchmarks.common import (setup_display, summarize, save_results,
+                               compare, temporary_leaderboard)
+import pygame
+import pygame_gui
+from src.game import Game
+from src.objects.snake import Snake
+
+
+# Benchmark settings (frame time delta in seconds)
+SEED = 2024
+TIME_DELTA = 1 / 60
+WARMUP_FRAMES = 30
+ALLOC_FRAMES = 60
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+
+def start_play(game):
+    """ Presses the start button of the menu to start a new game. """
+    pygame.event.post(pygame.event.Event(
+        pygame_gui.UI_BUTTON_PRESSED, ui_element=game.interface.start_btn))
+    game.game_events()
+
+
+def autopilot(game):
+    """
+    Steers the snake with the autopilot of the menu and keeps it alive,
+    so the PLAY scenarios never reach the game over.
+    """
+    def step(frame):
+        game.snake_menu_auto_path_update(TIME_DELTA)
+        game.snake.lifetime = Snake.LIFETIME
+    return step
+
+
+def menu_idle(game):
+    """ The menu attract loop with the default snake. """
+    return None
+
+
+def long_snake(length):
+    """ Returns a menu attract loop scenario with a long snake. """
+    def scenario(game):
+        game.snake = Snake(background=game.bgwalled, length=length)
+        return None
+    scenario.__doc__ = f"The menu attract loop with {length} snake parts."
+    return scenario
+
+
+def bombs_exploding(game):
+    """ Every bomb explodes again as soon as its explosion ends. """
+    start_play(game)
+    steer = autopilot(game)
+
+    def step(frame):
+        steer(frame)
+        for bomb in game.bombs:
+            if not bomb.exploding or bomb._explosion_index >= 10:
+                bomb.reset()
+                bomb._spawn_bomb()
+                bomb.destroy()
+    return step
+
+
+def items_spawned(game):
+    """ Every food, item and bomb is kept spawned on the arena. """
+    start_play(game)
+    steer = autopilot(game)
+    items = game.foods + game.items
+
+    def step(frame):
+        steer(frame)
+        for item in items:
+            if not item.spawned:
+                territories = ([i.territory for i in items] +
+                               list(game.snake.rects))
+                item.spawn(off_limits_rects=territories)
+        for bomb in game.bombs:
+            if not bomb.spawned:
+                bomb._spawn_bomb()
+    return step
+
+
+def floater_burst(game):
+    """ A burst of pickup floaters is spawned on every frame. """
+    start_play(game)
+    steer = autopilot(game)
+    icon = game.items[0].image
+
+    def step(frame):
+        steer(frame)
+        for _ in range(4):
+            position = pygame.Vector2(random.randint(100, 900),
+                                      random.randint(150, 650))
+            game.interface.spawn_regen_label(position, 2, 10)
+            game.interface.spawn_buff_label(icon, position, 5, 20, False)
+    return step
+
+
+# Scenario name: (setup function, number of measured frames)
+SCENARIOS = {
+    "menu_idle": (menu_idle, 600),
+    "snake_50": (long_snake(50), 300),
+    "snake_500": (long_snake(500), 120),
+    "snake_5000": (long_snake(5000), 30),
+    "bombs_exploding": (bombs_exploding, 300),
+    "items_spawned": (items_spawned, 300),
+    "floater_burst": (floater_burst, 300),
+}
+
+
+def play(screen, manager, setup, frames, *, on_frame):
+    """
+    Creates a new Game with the same seed, prepares it with the setup
+    function and plays the frames. The on_frame function is called with
+    the update and draw function of each frame after the warmup.
+    """
+    random.seed(SEED)
+    game = Game(screen, manager)
+    step = setup(game)
+
+    def update():
+        game.update(TIME_DELTA)
+        game.interface.update_gui(TIME_DELTA * 1000)
+
+    def draw():
+        screen.fill("black")
+        game.draw()
+        game.interface.draw_gui(screen)
+
+    try:
+        for frame in range(WARMUP_FRAMES + frames):
+            # Drop the timer events, the scenario does all the spawns
+            pygame.event.clear()
+            if step:
+                step(frame)
+            if frame < WARMUP_FRAMES:
+                update()
+                draw()
+            else:
+                on_frame(update, draw)
+    finally:
+        game.leaderboard.close()
+        # Remove the GUI elements of this game for the next scenario
+        manager.clear_and_reset()
+    return game
+
+
+def run_scenario(screen, manager, name, frames=None):
+    """
+    Plays the scenario twice, first for the timings and then with
+    tracemalloc for the allocations, and returns the summary.
+    """
+    setup, default_frames = SCENARIOS[name]
+    frames = frames or default_frames
+    update_times, draw_times = [], []
+
+    def timed(update, draw):
+        start = time.perf_counter()
+        update()
+        middle = time.perf_counter()
+        draw()
+        end = time.perf_counter()
+        update_times.append((middle - start) * 1000)
+        draw_times.append((end - middle) * 1000)
+
+    game = play(screen, manager, setup, frames, on_frame=timed)
+    state = game.state.name
+
+    # Measure the allocations in a separate run since tracing is slow
+    alloc_kib, blocks = [], []
+
+    def traced(update, draw):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        allocated = sys.getallocatedblocks()
+        update()
+        draw()
+        alloc_kib.append((tracemalloc.get_traced_memory()[1] - current)
+                         / 1024)
+        blocks.append(sys.getallocatedblocks() - allocated)
+
+    tracemalloc.start()
+    try:
+        play(screen, manager, setup, min(frames, ALLOC_FRAMES),
+             on_frame=traced)
+    finally:
+        tracemalloc.stop()
+
+    return {"frames": frames, "final_state": state,
+            "update_ms": summarize(update_times),
+            "draw_ms": summarize(draw_times),
+            "alloc_kib": summarize(alloc_kib),
+            "blocks": summarize(blocks)}
+
+
+def parse_args(argv=None):
+    """ Parses the command line options of the scenario benchmarks. """
+    parser = argparse.ArgumentParser(description="Run the game scenarios.")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                        help="scenarios to run (default: all), one of: "
+                             + ", ".join(SCENARIOS))
+    parser.add_argument("--frames", type=int,
+                        help="measured frames of each scenario")
+    parser.add_argument("--output", metavar="PATH",
+                        help="save the results as a JSON file")
+    parser.add_argument("--baseline", metavar="PATH", default=BASELINE_PATH,
+                        help="baseline results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="save the results as the new baseline")
+    parser.add_argument("--metric", default="p95",
+                        choices=["p50", "p95", "p99"],
+                        help="percentile compared with the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown before a regression (0.2=20%%)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    screen, manager = setup_display()
+    results = {}
+    # The games save to a temporary leaderboard, not the real one
+    with temporary_leaderboard():
+        for name in args.scenarios or SCENARIOS:
+            results[name] = run_scenario(screen, manager, name, args.frames)
+            result = results[name]
+            print(f"{name:<16} update {result['update_ms']} "
+                  f"draw {result['draw_ms']} "
+                  f"alloc_kib {result['alloc_kib']}")
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+    if not Path(args.baseline).exists():
+        print(f"No baseline file found in {args.baseline}")
+        return 0
+
+    # Compare the timings with the baseline and fail on regressions
+    regressions = [regression for regression in
+                   compare(results, args.baseline, metric=args.metric,
+                           threshold=args.threshold)
+                   if regression[1] in ("update_ms", "draw_ms")]
+    for name, key, old, new in regressions:
+        print(f"REGRESSION {name} {key} {args.metric}: "
+              f"{old:.3f} -> {new:.3f}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Stress Benchmarks - stress.py
+-----------------------------------------------------------
+This module plays the game with the stress profile of the
+Config (hundreds of bombs, dozens of foods and items and an
+arena several screens large) at increasing fractions of
+its counts. Each level records the time of every stage of
+the frame profiler, so the stage that grows the fastest
+with the counts (collision, spawning, particles, drawing)
+can be found before it becomes a problem in a real game.
+    python -m benchmarks.stress --levels 0.1 0.5 1
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import argparse
+import random
+import sys
+# The benchmark helpers select the SDL dummy driver before pygame loads
+from benchmarks.common import (setup_display, save_results,
+                               temporary_leaderboard)
+from benchmarks.scenarios import SEED, TIME_DELTA, autopilot, start_play
+from src.config import Config
+from src.game import Game
+from src.profiler import FrameProfiler
+from src.timers import Timers
+
+
+# Benchmark settings
+WARMUP_FRAMES = 60
+FRAMES = 600
+LEVELS = (0.1, 0.25, 0.5, 1.0)
+# Profile values that are scaled by each level
+COUNTS = ("BOMB_COUNT", "FOOD_COUNT", "FOOD_BUFF_COUNT",
+          "SPEEDUP_COUNT", "SLOWDOWN_COUNT")
+
+
+def level_profile(level):
+    """ Returns the stress profile with its counts scaled by the level. """
+    profile = dict(Config.STRESS_PROFILE)
+    for name in COUNTS:
+        profile[name] = max(1, round(profile[name] * level))
+    return profile
+
+
+def run_level(screen, manager, level, frames):
+    """
+    Plays a game with the scaled stress profile like the main loop does
+    (the spawn timer events are handled) and returns the percentiles of
+    the frame profiler stages.
+    """
+    previous = Config.apply_profile(level_profile(level))
+    random.seed(SEED)
+    game = Game(screen, manager)
+    try:
+        start_play(game)
+        steer = autopilot(game)
+        FrameProfiler.HISTORY = frames
+        for frame in range(WARMUP_FRAMES + frames):
+            # Start profiling after the warmup frames
+            if frame == WARMUP_FRAMES:
+                FrameProfiler.toggle()
+            steer(frame)
+            with FrameProfiler.stage("events"):
+                game.game_events()
+            game.update(TIME_DELTA)
+            with FrameProfiler.stage("gui update"):
+                game.interface.update_gui(TIME_DELTA * 1000)
+            screen.fill("black")
+            with FrameProfiler.stage("draw"):
+                game.draw()
+            with FrameProfiler.stage("gui draw"):
+                game.interface.draw_gui(screen)
+            FrameProfiler.end_frame()
+        summary = FrameProfiler.summary()
+        # The frame time is the total of the stages (no FPS limit here)
+        return {"counts": {name: getattr(Config, name) for name in COUNTS},
+                "spawned": {"bombs": sum(b.spawned for b in game.bombs),
+                            "foods": sum(f.spawned for f in game.foods),
+                            "items": sum(i.spawned for i in game.items)},
+                "final_state": game.state.name,
+                "stages_ms": {name: dict(zip(("p50", "p95", "p99"),
+                                             [round(v, 4) for v in values]))
+                              for name, values in summary.items()}}
+    finally:
+        if FrameProfiler.enabled:
+            FrameProfiler.toggle()
+        Timers.clear()
+        game.leaderboard.close()
+        manager.clear_and_reset()
+        Config.apply_profile(previous)
+
+
+def parse_args(argv=None):
+    """ Parses the command line options of the stress benchmarks. """
+    parser = argparse.ArgumentParser(description="Run the stress levels.")
+    parser.add_argument("--levels", nargs="+", type=float, default=LEVELS,
+                        help="fractions of the stress profile counts")
+    parser.add_argument("--frames", type=int, default=FRAMES,
+                        help="measured frames of each level")
+    parser.add_argument("--metric", default="p95",
+                        choices=["p50", "p95", "p99"],
+                        help="percentile shown in the printed table")
+    parser.add_argument("--output", metavar="PATH",
+                        help="save the results as a JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    screen, manager = setup_display()
+    results = {}
+    # The games save to a temporary leaderboard, not the real one
+    with temporary_leaderboard():
+        for level in args.levels:
+            results[f"x{level:g}"] = run_level(screen, manager, level,
+                                               args.frames)
+
+    # Print the stage times of each level side by side
+    print(f"{args.metric + ' ms':<12}" +
+          "".join(f"{name:>10}" for name in results))
+    print(f"{'bombs':<12}" + "".join(f"{r['counts']['BOMB_COUNT']:>10}"
+                                     for r in results.values()))
+    for stage in ("frame",) + FrameProfiler.STAGES:
+        print(f"{stage:<12}" +
+              "".join(f"{r['stages_ms'][stage][args.metric]:>10.3f}"
+                      for r in results.values()))
+    if args.output:
+        save_results(args.output, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
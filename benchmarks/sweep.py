@@ -0,0 +1,262 @@
+"""
+Parameter Sweep Runner - sweep.py
+-----------------------------------------------------------
+This module plays many headless bot games for each point
+of a sweep of the Config values, like the bomb spawn delay
+or the snake lifetime, on a pool of worker processes. The
+points are a grid of the given values or a random design
+of the given ranges. The games of a point run with the
+values applied as a Config profile, which also replaces
+the class constants bound to them. Each finished point is
+added to a cache file, so an interrupted sweep continues
+from the points that are not done yet. The summary of
+every point is written as a CSV table, one column for
+each value and result.
+    python -m benchmarks.sweep --param SNAKE_LIFETIME=60,100,140
+    python -m benchmarks.sweep --design random --points 50 \\
+        --param BOMB_MIN_SPAWN_DELAY=1:6 --param FOOD_BUFF_LIFETIME=2:8
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+# The benchmark helpers select the SDL dummy driver before pygame loads
+from benchmarks.common import OUTPUT_DIR
+from benchmarks.tournament import (FIELDS, POLICIES, TIME_DELTA, init_worker,
+                                   play_game, summarize_games)
+from src.config import Config
+
+
+# Sweep settings (the games of each point use the same seeds)
+SEED = 2024
+GAMES = 20
+MAX_MINUTES = 5
+DESIGN_SEED = 0
+CACHE_PATH = OUTPUT_DIR / "sweep_cache.jsonl"
+OUTPUT_PATH = OUTPUT_DIR / "sweep.csv"
+# Values swept when no --param is given
+PARAMETERS = {"BOMB_MIN_SPAWN_DELAY": [1, 3, 5],
+              "SNAKE_LIFETIME": [60, 100, 140]}
+# Snake speeds must divide the tile size so the snake can still turn
+SPEEDS = ("SNAKE_SPEED", "SPEEDUP_VALUE", "SLOWDOWN_VALUE")
+
+
+def parse_value(text):
+    """ Returns the text as an int, or as a float if it is not an int. """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_param(text):
+    """
+    Parses a NAME=1,2,3 list of values or a NAME=low:high range into
+    the name of the Config value and the list or (low, high) tuple.
+    """
+    name, _, values = text.partition("=")
+    if not hasattr(Config, name):
+        raise argparse.ArgumentTypeError(f"unknown Config value: {name}")
+    if ":" in values:
+        low, high = values.split(":")
+        if name in SPEEDS:
+            raise argparse.ArgumentTypeError(
+                f"{name} must be a list of the speeds to try")
+        return name, (parse_value(low), parse_value(high))
+    values = [parse_value(value) for value in values.split(",")]
+    if name in SPEEDS and any(Config.SNAKE_SIZE % value for value in values):
+        raise argparse.ArgumentTypeError(
+            f"{name} values must divide the tile size {Config.SNAKE_SIZE}")
+    return name, values
+
+
+def grid_design(parameters):
+    """ Returns every combination of the values of the parameters. """
+    names = list(parameters)
+    return [dict(zip(names, values))
+            for values in itertools.product(*parameters.values())]
+
+
+def random_design(parameters, points, seed):
+    """
+    Returns the points with random values of the parameters. A range
+    of ints draws ints, a range with a float draws floats. The same
+    seed always returns the same points, so a sweep can be resumed.
+    """
+    rng = random.Random(seed)
+    design = []
+    for _ in range(points):
+        point = {}
+        for name, values in parameters.items():
+            if isinstance(values, list):
+                point[name] = rng.choice(values)
+            elif all(isinstance(value, int) for value in values):
+                point[name] = rng.randint(*values)
+            else:
+                point[name] = round(rng.uniform(*values), 3)
+        design.append(point)
+    return design
+
+
+def point_key(point, settings):
+    """ Returns the cache key of a point played with the settings. """
+    return json.dumps([point, settings], sort_keys=True)
+
+
+def load_cache(path):
+    """ Returns the summaries of the finished points in the cache file. """
+    cache = {}
+    if Path(path).exists():
+        with open(path) as cache_file:
+            for line in cache_file:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = point_key(entry["point"], entry["settings"])
+                    cache[key] = entry["summary"]
+    return cache
+
+
+def play_point_game(point, policy, seed, max_ticks):
+    """ Plays a game with the Config values of the point applied. """
+    previous = Config.apply_profile(point)
+    try:
+        return play_game(policy, seed, max_ticks)
+    finally:
+        Config.apply_profile(previous)
+
+
+def run_sweep(points, settings, cache, cache_path, workers):
+    """
+    Plays the games of the points that are not in the cache on the
+    worker processes. A point is added to the cache file as soon as
+    all of its games are done.
+    """
+    seeds = range(settings["seed"], settings["seed"] + settings["games"])
+    pending = [point for point in points
+               if point_key(point, settings) not in cache]
+    print(f"{len(points) - len(pending)} of {len(points)} points cached")
+    if not pending:
+        return
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    # The folder of the leaderboards is removed after the workers end
+    with tempfile.TemporaryDirectory(prefix="snake-bots-") as folder, \
+            open(cache_path, "a") as cache_file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                initargs=(folder,)) as executor:
+        futures = {executor.submit(play_point_game, point,
+                                   settings["policy"], seed,
+                                   settings["max_ticks"]): index
+                   for index, point in enumerate(pending) for seed in seeds}
+        games = {index: [] for index in range(len(pending))}
+        for future in as_completed(futures):
+            index = futures[future]
+            games[index].append(future.result())
+            if len(games[index]) < len(seeds):
+                continue
+            # Save the summary of the point when its last game is done
+            point = pending[index]
+            summary = summarize_games(games.pop(index))[settings["policy"]]
+            summary["deaths"] = dict(summary["deaths"])
+            cache[point_key(point, settings)] = summary
+            cache_file.write(json.dumps({"point": point,
+                                         "settings": settings,
+                                         "summary": summary}) + "\n")
+            cache_file.flush()
+            print(f"{point} score {summary['score'][0]:.1f} "
+                  f"± {summary['score'][1]:.1f}")
+
+
+def write_table(path, points, settings, cache):
+    """
+    Writes the summary of each point as a row of a CSV table with the
+    values of the point, the mean and interval of each result and the
+    fraction of the games that ended by each death cause.
+    """
+    summaries = [cache[point_key(point, settings)] for point in points]
+    causes = sorted({cause for summary in summaries
+                     for cause in summary["deaths"]})
+    columns = (list(points[0]) + ["games"] +
+               [f"{field}_{stat}" for field in FIELDS
+                for stat in ("mean", "ci95")] +
+               [f"death_{cause}" for cause in causes])
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as table_file:
+        writer = csv.writer(table_file)
+        writer.writerow(columns)
+        for point, summary in zip(points, summaries):
+            writer.writerow(
+                list(point.values()) + [summary["games"]] +
+                [round(value, 4) for field in FIELDS
+                 for value in summary[field]] +
+                [round(summary["deaths"].get(cause, 0) / summary["games"], 4)
+                 for cause in causes])
+
+
+def parse_args(argv=None):
+    """ Parses the command line options of the parameter sweep. """
+    parser = argparse.ArgumentParser(description="Sweep the Config values.")
+    parser.add_argument("--param", action="append", type=parse_param,
+                        metavar="NAME=VALUES",
+                        help="Config value with a list (1,2,3) or a range "
+                             "(1:6, random design only) to sweep")
+    parser.add_argument("--design", default="grid",
+                        choices=["grid", "random"],
+                        help="every combination or random points")
+    parser.add_argument("--points", type=int, default=20,
+                        help="points of the random design")
+    parser.add_argument("--design-seed", type=int, default=DESIGN_SEED,
+                        help="seed of the random design points")
+    parser.add_argument("--policy", default="autopilot",
+                        choices=list(POLICIES),
+                        help="bot policy that plays the games")
+    parser.add_argument("--games", type=int, default=GAMES,
+                        help="games (seeds) played at each point")
+    parser.add_argument("--seed", type=int, default=SEED,
+                        help="seed of the first game of each point")
+    parser.add_argument("--max-minutes", type=float, default=MAX_MINUTES,
+                        help="game minutes before a game is stopped")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: all the cores)")
+    parser.add_argument("--cache", metavar="PATH", default=CACHE_PATH,
+                        help="JSON lines file of the finished points")
+    parser.add_argument("--output", metavar="PATH", default=OUTPUT_PATH,
+                        help="CSV table of the point results")
+    args = parser.parse_args(argv)
+    args.parameters = dict(args.param or PARAMETERS.items())
+    ranges = [name for name, values in args.parameters.items()
+              if not isinstance(values, list)]
+    if args.design == "grid" and ranges:
+        parser.error(f"ranges need the random design: {', '.join(ranges)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.design == "grid":
+        points = grid_design(args.parameters)
+    else:
+        points = random_design(args.parameters, args.points,
+                               args.design_seed)
+    # The cached points are only used if they were played the same way
+    settings = {"policy": args.policy, "games": args.games,
+                "seed": args.seed,
+                "max_ticks": round(args.max_minutes * 60 / TIME_DELTA)}
+    cache = load_cache(args.cache)
+    run_sweep(points, settings, cache, args.cache, args.workers)
+    write_table(args.output, points, settings, cache)
+    print(f"Saved the table of {len(points)} points to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Tournament Runner - tournament.py
+-----------------------------------------------------------
+This module plays many headless games of the bot policies
+on a pool of worker processes, one game for each pair of a
+policy and a seed. Every policy plays the same seeds, so
+the versions of a bot can be compared on the same games.
+Each finished game is written at once as a line of the
+JSON lines output file, and the mean of each result is
+printed with its 95% confidence interval at the end.
+    python -m benchmarks.tournament --games 2000
+    python -m benchmarks.tournament autopilot --workers 8
+The games run with the real rules and timer events at the
+fixed tick, but they are not drawn.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+# The benchmark helpers select the SDL dummy driver before pygame loads
+from benchmarks.common import (OUTPUT_DIR, setup_display,
+                               use_leaderboard_folder)
+from benchmarks.scenarios import TIME_DELTA, start_play
+import pygame
+from src.config import Config, GAMESTATE
+from src.game import Game
+from src.objects.snake import Snake
+from src.policy import GreedyPolicy
+from src.timers import Timers
+
+
+# Tournament settings (the games end after MAX_MINUTES of play)
+SEED = 2024
+GAMES = 100
+MAX_MINUTES = 10
+OUTPUT_PATH = OUTPUT_DIR / "tournament.jsonl"
+# Results of each game that are summarized, and the z of the 95% interval
+FIELDS = ("score", "stretch", "lifetime", "bomb_hits")
+Z_95 = 1.96
+
+# The screen and GUI manager of this worker process
+_display = None
+
+
+def use_autopilot(game):
+    """ Lets the autopilot of the menu play the game. """
+    game.autopilot_play = True
+
+
+def use_greedy(game):
+    """ Lets the greedy policy play the game. """
+    GreedyPolicy().attach(game)
+
+
+POLICIES = {
+    "autopilot": use_autopilot,
+    "greedy": use_greedy,
+}
+
+
+def init_worker(folder):
+    """
+    Sets up pygame without a window once for each worker process. The
+    games of the worker save to its own leaderboard in the temporary
+    folder instead of the real leaderboard of the game.
+    """
+    global _display
+    _display = setup_display()
+    use_leaderboard_folder(folder, f"leaderboard_{os.getpid()}.db")
+
+
+def play_game(policy, seed, max_ticks):
+    """
+    Plays a new game with the policy and the seed until the game over
+    or the max ticks, and returns the results of the game.
+    """
+    screen, manager = _display
+    # The buffs change these class values, a game may have ended buffed
+    Snake.set_speed_constants(Config.SNAKE_SPEED)
+    Snake.DAMAGED = False
+    pygame.event.clear()
+    random.seed(seed)
+    game = Game(screen, manager)
+    try:
+        start_play(game)
+        POLICIES[policy](game)
+        ticks = 0
+        start = time.perf_counter()
+        while game.state == GAMESTATE.PLAY and ticks < max_ticks:
+            game.game_events()
+            game.update(TIME_DELTA)
+            ticks += 1
+        return {"policy": policy, "seed": seed, "score": game.score,
+                "stretch": game.snake.stretch,
+                "lifetime": round(game.total_time, 3),
+                "bomb_hits": game.bomb_hits,
+                "death_cause": game.death_cause or "timeout",
+                "ticks": ticks,
+                "seconds": round(time.perf_counter() - start, 3)}
+    finally:
+        Timers.clear()
+        game.leaderboard.close()
+        # Remove the GUI elements of this game for the next game
+        manager.clear_and_reset()
+
+
+def confidence(values):
+    """ Returns the mean of the values and the half width of its 95% CI. """
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, 0.0
+    return mean, Z_95 * statistics.stdev(values) / math.sqrt(len(values))
+
+
+def summarize_games(games):
+    """
+    Returns the summary of the games of each policy: the number of
+    games, the mean and interval of each result and the death causes.
+    """
+    summary = {}
+    for policy in dict.fromkeys(game["policy"] for game in games):
+        played = [game for game in games if game["policy"] == policy]
+        summary[policy] = {
+            "games": len(played),
+            **{field: confidence([game[field] for game in played])
+               for field in FIELDS},
+            "deaths": Counter(game["death_cause"] for game in played),
+        }
+    return summary
+
+
+def run_tournament(policies, seeds, max_ticks, output, workers):
+    """
+    Plays every policy on every seed on the worker processes. Each game
+    is written to the output file as soon as it finishes, in the order
+    that they finish. Returns the results of all the games.
+    """
+    games = []
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # The folder of the leaderboards is removed after the workers end
+    with tempfile.TemporaryDirectory(prefix="snake-bots-") as folder, \
+            open(output, "w") as output_file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                initargs=(folder,)) as executor:
+        futures = [executor.submit(play_game, policy, seed, max_ticks)
+                   for policy in policies for seed in seeds]
+        for done, future in enumerate(as_completed(futures), start=1):
+            game = future.result()
+            games.append(game)
+            output_file.write(json.dumps(game) + "\n")
+            output_file.flush()
+            if done % 100 == 0 or done == len(futures):
+                print(f"{done}/{len(futures)} games", file=sys.stderr)
+    return games
+
+
+def parse_args(argv=None):
+    """ Parses the command line options of the tournament runner. """
+    parser = argparse.ArgumentParser(description="Play the bot policies.")
+    parser.add_argument("policies", nargs="*", metavar="POLICY",
+                        help="policies to play (default: all), one of: "
+                             + ", ".join(POLICIES))
+    parser.add_argument("--games", type=int, default=GAMES,
+                        help="games (seeds) played by each policy")
+    parser.add_argument("--seed", type=int, default=SEED,
+                        help="seed of the first game")
+    parser.add_argument("--max-minutes", type=float, default=MAX_MINUTES,
+                        help="game minutes before a game is stopped")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: all the cores)")
+    parser.add_argument("--output", metavar="PATH", default=OUTPUT_PATH,
+                        help="JSON lines file of the game results")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.policies if name not in POLICIES]
+    if unknown:
+        parser.error(f"unknown policies: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seeds = range(args.seed, args.seed + args.games)
+    max_ticks = round(args.max_minutes * 60 / TIME_DELTA)
+    start = time.perf_counter()
+    games = run_tournament(args.policies or list(POLICIES), seeds,
+                           max_ticks, args.output, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Played {len(games)} games in {elapsed:.1f}s, "
+          f"saved to {args.output}")
+
+    # Print the mean and 95% interval of each result of each policy
+    print(f"{'policy':<12}{'games':>6}" +
+          "".join(f"{field:>20}" for field in FIELDS) + "  deaths")
+    for policy, result in summarize_games(games).items():
+        print(f"{policy:<12}{result['games']:>6}" +
+              "".join(f"{result[field][0]:>12.1f} ±{result[field][1]:>6.1f}"
+                      for field in FIELDS) + "  " +
+              ", ".join(f"{cause} {count}"
+                        for cause, count in result["deaths"].most_common()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Autopilot Class - autopilot.py
+-----------------------------------------------------------
+This module contains the Autopilot Class that steers the
+snake on a grid of snake sized tiles. The snake can only
+turn when its head reaches a tile, so the autopilot plans
+once per tile with a breadth first search toward the
+nearest spawned food (or a random tile when there is no
+food), going around the live bombs and its own body.
+A body part is only an obstacle until the snake has moved
+far enough for that part to leave its tile. Before taking
+a step, a flood fill checks that the snake still has room
+to fit after it. The path is kept while the foods and bombs
+do not change, so most tiles only check the next step.
+It is used by the menu attract loop and can play the game
+for the soak tests and bot baselines (--autopilot).
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import random
+from collections import deque
+from src.config import Config
+from src.objects.snake import Snake
+
+
+class Autopilot:
+
+    # Tile size of the grid (the snake moves one tile between turns)
+    TILE = Config.SNAKE_SIZE
+    # Steps on the grid with the name of their Snake direction (the
+    # directions are read each time since the buffs replace them)
+    STEPS = {(0, -1): "UP", (0, 1): "DOWN", (-1, 0): "LEFT", (1, 0): "RIGHT"}
+    # Obstacles that are never left (the bombs)
+    FOREVER = float("inf")
+
+    def __init__(self, bounds):
+        """
+        Creates the autopilot for the arena bounds. The snake dies if
+        its head goes outside of these bounds.
+        """
+        self.bounds = bounds
+        self.reset()
+
+    def reset(self):
+        """ Forgets the planned path (for a new snake). """
+        self._decided = None
+        self._path = []
+        self._signature = None
+        self._wander = None
+        self.plans = 0
+
+    def steer(self, snake, *, foods=(), bombs=()):
+        """
+        Sets the direction the snake takes when its head reaches the
+        next tile. This is called every tick, but it only plans when
+        the head starts moving to a new tile.
+        """
+        if snake.dead:
+            return
+        x, y = snake.head.future_bounds.topleft
+        # The grid follows the tiles of the head position
+        origin = (x % self.TILE, y % self.TILE)
+        cell = ((x - origin[0]) // self.TILE, (y - origin[1]) // self.TILE)
+        if cell == self._decided:
+            return
+        self._decided = cell
+        step = self._next_step(cell, origin, snake, foods, bombs)
+        if step:
+            snake.move(getattr(Snake, self.STEPS[step]))
+
+    def _next_step(self, cell, origin, snake, foods, bombs):
+        """
+        Returns the step from the cell to take next. The saved path is
+        used if the foods and bombs did not change and its next tile is
+        still free, otherwise a new path is searched.
+        """
+        columns, rows = self._grid_size(origin)
+        blocked = self._obstacles(origin, snake, bombs)
+        targets = [food.bounds for food in foods if food.spawned]
+        signature = (tuple(tuple(target) for target in targets),
+                     tuple(cell for cell, left in blocked.items()
+                           if left == self.FOREVER))
+
+        # Keep the saved path while the world has not changed
+        if self._path and self._path[0] == cell:
+            self._path.pop(0)
+        if (signature != self._signature or not self._path or
+                blocked.get(self._path[0], 0) > 1):
+            self._signature = signature
+            goals = self._cells(targets, origin)
+            if not goals:
+                goals = self._wander_goal(cell, columns, rows, blocked)
+            self._path = self._search(cell, columns, rows, blocked, goals)
+            self.plans += 1
+
+        # Only take the path if there is still room for the snake after it
+        length = len(snake.body) + len(snake.tails) + 1
+        if self._path:
+            first = self._path[0]
+            if self._room(first, columns, rows, blocked, length) >= length:
+                return first[0] - cell[0], first[1] - cell[1]
+            self._path = []
+
+        # Else go to the free neighbor tile with the most room
+        best, best_room = None, -1
+        for step in self.STEPS:
+            direction = getattr(Snake, self.STEPS[step])
+            if direction + snake.direction == Snake.ZERO:
+                continue
+            neighbor = (cell[0] + step[0], cell[1] + step[1])
+            if not self._inside(neighbor, columns, rows):
+                continue
+            if blocked.get(neighbor, 0) > 1:
+                continue
+            room = self._room(neighbor, columns, rows, blocked, length)
+            if room > best_room:
+                best, best_room = step, room
+        return best
+
+    def _grid_size(self, origin):
+        """ Returns the first and last column and row inside the bounds. """
+        left = -((origin[0] - self.bounds.left) // self.TILE)
+        top = -((origin[1] - self.bounds.top) // self.TILE)
+        right = (self.bounds.right - self.TILE - origin[0]) // self.TILE
+        bottom = (self.bounds.bottom - self.TILE - origin[1]) // self.TILE
+        return (left, right), (top, bottom)
+
+    @staticmethod
+    def _inside(cell, columns, rows):
+        """ Returns True if the cell is inside the grid. """
+        return (columns[0] <= cell[0] <= columns[1] and
+                rows[0] <= cell[1] <= rows[1])
+
+    def _cells(self, rects, origin):
+        """ Returns the set of cells that the rects overlap. """
+        cells = set()
+        for rect in rects:
+            if not rect:
+                continue
+            left = (rect.left - origin[0]) // self.TILE
+            right = (rect.right - 1 - origin[0]) // self.TILE
+            top = (rect.top - origin[1]) // self.TILE
+            bottom = (rect.bottom - 1 - origin[1]) // self.TILE
+            cells.update((x, y) for x in range(left, right + 1)
+                         for y in range(top, bottom + 1))
+        return cells
+
+    def _obstacles(self, origin, snake, bombs):
+        """
+        Returns the blocked cells with the number of steps until they are
+        free. The tail leaves its tile first and the bombs never do.
+        """
+        parts = snake.parts
+        growth = len(snake.tails)
+        blocked = {}
+        for index, part in enumerate(parts):
+            left = len(parts) - index + growth
+            for cell in self._cells((part.rect,), origin):
+                blocked[cell] = max(blocked.get(cell, 0), left)
+        for cell in self._cells([bomb.bounds for bomb in bombs
+                                 if bomb.spawned], origin):
+            blocked[cell] = self.FOREVER
+        return blocked
+
+    def _search(self, start, columns, rows, blocked, goals):
+        """
+        Returns the shortest path of cells (without the start) to one of
+        the goals. A cell can be passed if the snake leaves it before the
+        head arrives. Returns an empty list if no goal can be reached.
+        """
+        parents = {start: None}
+        queue = deque([(start, 0)])
+        while queue:
+            cell, steps = queue.popleft()
+            if cell in goals and cell != start:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = parents[cell]
+                return path[::-1]
+            for step in self.STEPS:
+                neighbor = (cell[0] + step[0], cell[1] + step[1])
+                if (neighbor in parents or
+                        not self._inside(neighbor, columns, rows) or
+                        blocked.get(neighbor, 0) > steps + 1):
+                    continue
+                parents[neighbor] = cell
+                queue.append((neighbor, steps + 1))
+        return []
+
+    def _room(self, start, columns, rows, blocked, limit):
+        """
+        Returns the number of cells that can be reached from the start
+        cell (a flood fill), stopping early once the limit is reached.
+        """
+        if blocked.get(start, 0) > 1:
+            return 0
+        seen = {start}
+        queue = deque([(start, 1)])
+        while queue and len(seen) < limit:
+            cell, steps = queue.popleft()
+            for step in self.STEPS:
+                neighbor = (cell[0] + step[0], cell[1] + step[1])
+                if (neighbor in seen or
+                        not self._inside(neighbor, columns, rows) or
+                        blocked.get(neighbor, 0) > steps + 1):
+                    continue
+                seen.add(neighbor)
+                queue.append((neighbor, steps + 1))
+        return len(seen)
+
+    def _wander_goal(self, cell, columns, rows, blocked):
+        """
+        Returns a random free cell as the goal when there is no food,
+        which is kept until the snake reaches it.
+        """
+        if self._wander is None or self._wander == cell:
+            for _ in range(20):
+                goal = (random.randint(*columns), random.randint(*rows))
+                if goal != cell and goal not in blocked:
+                    self._wander = goal
+                    break
+        return {self._wander} if self._wander else set()
@@ -0,0 +1,146 @@
+"""
+Camera Classes - camera.py
+-----------------------------------------------------------
+This module contains the classes that let the arena be
+larger than the screen. The Camera is the part of the arena
+shown on the screen and follows the snake head. The game
+objects keep drawing at their arena positions on a
+CameraSurface, which moves every blit to the screen and
+skips the blits that the camera can not see. The arena
+background is a TiledBackground that draws the visible
+tiles of the background and walls instead of keeping one
+image of the whole arena.
+    view = camera.view(screen)
+    snake.draw(view)
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import pygame
+from src.renderer import draw_sprite
+
+
+class Camera:
+
+    def __init__(self, size, world):
+        """
+        Creates the camera with the size of the screen for the world
+        rect (the whole arena). It starts at the top left of the world.
+        """
+        self.world = pygame.Rect(world)
+        self.rect = pygame.Rect(self.world.topleft, size)
+
+    def follow(self, position):
+        """
+        Centers the camera on the position, but never shows the outside
+        of the world. A world as large as the screen never moves.
+        """
+        self.rect.center = (round(position[0]), round(position[1]))
+        self.rect.clamp_ip(self.world)
+
+    def sees(self, rect, margin=0):
+        """
+        Returns True if the rect is inside the camera or within the
+        margin around it (for the effects drawn around an object).
+        """
+        view = self.rect
+        return (rect.right > view.left - margin and
+                rect.left < view.right + margin and
+                rect.bottom > view.top - margin and
+                rect.top < view.bottom + margin)
+
+    def to_screen(self, position):
+        """ Returns the screen position of an arena position. """
+        return position[0] - self.rect.x, position[1] - self.rect.y
+
+    def view(self, surface):
+        """ Returns a CameraSurface that draws on the surface. """
+        return CameraSurface(surface, self)
+
+
+class CameraSurface:
+
+    def __init__(self, surface, camera):
+        """
+        Wraps a surface (the screen or a DisplayList) so the objects can
+        draw at their arena positions through the camera.
+        """
+        self.surface = surface
+        self.camera = camera
+        self.culled = 0
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Blits like Surface.blit with the destination in arena positions.
+        The blit is skipped if it is outside of the camera.
+        """
+        x, y = dest[0], dest[1]
+        if area is None:
+            width, height = source.get_size()
+        else:
+            width, height = area[2], area[3]
+        view = self.camera.rect
+        if (x + width <= view.left or x >= view.right or
+                y + height <= view.top or y >= view.bottom):
+            self.culled += 1
+            return
+        self.surface.blit(source, (x - view.x, y - view.y), area,
+                          special_flags)
+
+    def draw_sprite(self, image, position, size, **kwargs):
+        """
+        Draws a sprite like the renderer draw_sprite function with the
+        position in arena positions. It is skipped if it is not seen.
+        """
+        x, y = position[0], position[1]
+        view = self.camera.rect
+        if (x + size[0] <= view.left or x >= view.right or
+                y + size[1] <= view.top or y >= view.bottom):
+            self.culled += 1
+            return
+        draw_sprite(self.surface, image, (x - view.x, y - view.y), size,
+                    **kwargs)
+
+
+class TiledBackground:
+
+    def __init__(self, tile, size, walls=()):
+        """
+        Creates the background of an arena of the given size that is
+        covered by the tile image. The walls are a list of (image,
+        position) drawn over the tiles.
+        """
+        # Convert the images to the screen format for faster blits
+        self.tile = tile.convert()
+        self.rect = pygame.Rect((0, 0), size)
+        images = {}
+        self.walls = []
+        for image, position in walls:
+            if image not in images:
+                images[image] = image.convert()
+            self.walls.append((images[image], position))
+
+    def draw(self, view):
+        """
+        Draws the tiles and walls that the camera of the CameraSurface
+        can see. The tiles outside of the camera are not even tried.
+        """
+        area = view.camera.rect.clip(self.rect)
+        width, height = self.tile.get_size()
+        for x in range(area.left - area.left % width, area.right, width):
+            for y in range(area.top - area.top % height, area.bottom,
+                           height):
+                view.blit(self.tile, (x, y))
+        for image, position in self.walls:
+            view.blit(image, position)
+
+    def subsurface(self, rect):
+        """
+        Returns a new surface with the background inside the rect, like
+        Surface.subsurface of an image of the whole arena. The snake uses
+        it for the background patches of its turn covers.
+        """
+        rect = pygame.Rect(rect)
+        patch = pygame.Surface(rect.size)
+        self.draw(Camera(rect.size, rect).view(patch))
+        return patch
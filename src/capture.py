@@ -0,0 +1,194 @@
+"""
+FrameCapture Class - capture.py
+-----------------------------------------------------------
+This module contains the FrameCapture Class that records
+the rendered frames of the game to the disk without an
+external screen recorder. The frames are copied into a ring
+of surfaces that are created once, and a writer thread
+appends them to a raw video file. The main thread only
+copies the screen into a free surface of the ring; if the
+writer falls behind and no surface is free, the frame is
+dropped instead of waiting, so the game loop never stalls.
+    python -m src.main --capture captures/bug.raw
+    python -m src.main --capture captures/attract
+A raw video can be converted with the ffmpeg command that
+is saved next to it in the .json file. A directory path
+records the raw video frames.raw in the directory, which
+is converted to PNG images after the game, since encoding
+a PNG holds the GIL far longer than a frame:
+    python -m src.capture captures/attract/frames.raw
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+from pathlib import Path
+import pygame
+from src.config import Config
+
+
+class FrameCapture:
+
+    # Number of surfaces in the ring (the frames that can be waiting)
+    BUFFERS = Config.CAPTURE_BUFFERS
+
+    def __init__(self, path, screen, *, fps=Config.FPS):
+        """
+        Creates the ring of surfaces with the size and pixel format of
+        the screen and starts the writer thread. If the path ends with
+        .raw the frames are appended to that raw video file, else the
+        path is a directory for the PNG images, and the frames are
+        recorded to its frames.raw file to be converted later. The fps
+        is the frame rate saved with the raw video.
+        """
+        self.path = Path(path)
+        self.directory = None
+        if self.path.suffix != ".raw":
+            self.directory = self.path
+            self.path = self.directory / "frames.raw"
+        self.fps = fps
+        self.frames = 0
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+        self._screen = screen
+        self._surfaces = [pygame.Surface(screen.get_size(), 0, screen)
+                          for _ in range(self.BUFFERS)]
+        # Indices of the surfaces that are free and that wait to be saved
+        self._free = queue.SimpleQueue()
+        for index in range(self.BUFFERS):
+            self._free.put(index)
+        self._ready = queue.SimpleQueue()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._thread = threading.Thread(target=self._write, name="capture",
+                                        daemon=True)
+        self._thread.start()
+
+    def capture(self, surface=None):
+        """
+        Copies the surface (the screen by default) into a free surface
+        of the ring for the writer thread. The frame is dropped if all
+        the surfaces are still waiting to be saved.
+        """
+        self.frames += 1
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        if surface is None:
+            surface = self._screen
+        self._surfaces[index].blit(surface, (0, 0))
+        self._ready.put(index)
+
+    def _write(self):
+        """
+        Saves the frames in the order they were captured and gives their
+        surfaces back to the ring. Stops at the None sentinel.
+        """
+        while (index := self._ready.get()) is not None:
+            try:
+                if self.error is None:
+                    # The pixels are written straight from the buffer
+                    self._file.write(self._surfaces[index].get_buffer())
+                    self.written += 1
+            except Exception as error:
+                self.error = error
+            self._free.put(index)
+
+    def pixel_format(self):
+        """
+        Returns the ffmpeg name of the pixel format of the screen, like
+        bgr0 for the usual 32 bit surfaces (in the byte order in memory).
+        """
+        bytesize = self._screen.get_bytesize()
+        masks = self._screen.get_masks()
+        shifts = self._screen.get_shifts()
+        channels = ["0"] * bytesize
+        for name, mask, shift in zip("rgba", masks, shifts):
+            if mask:
+                byte = shift // 8
+                if sys.byteorder == "big":
+                    byte = bytesize - 1 - byte
+                channels[byte] = name
+        name = "".join(channels)
+        return name if bytesize == 4 else f"{name}24"
+
+    def close(self):
+        """
+        Waits for the writer thread to save the captured frames. The
+        size and format of the frames are saved in a JSON file next to
+        the raw video. Raises the error of the writer if it failed.
+        """
+        self._ready.put(None)
+        self._thread.join()
+        self._file.close()
+        width, height = self._screen.get_size()
+        pitch = self._screen.get_pitch()
+        pixel_format = self.pixel_format()
+        info = {"width": width, "height": height, "pitch": pitch,
+                "bitsize": self._screen.get_bitsize(),
+                "masks": list(self._screen.get_masks()[:3]),
+                "pixel_format": pixel_format, "fps": self.fps,
+                "frames": self.written, "dropped": self.dropped,
+                "ffmpeg": f"ffmpeg -f rawvideo -pixel_format "
+                          f"{pixel_format} -video_size {width}x{height} "
+                          f"-framerate {self.fps} -i {self.path.name} "
+                          f"{self.path.stem}.mp4"}
+        with open(self.path.with_suffix(".json"), "w") as info_file:
+            json.dump(info, info_file, indent=2)
+        if self.error:
+            raise RuntimeError("The frame capture failed") from self.error
+
+
+def convert(path, directory=None):
+    """
+    Saves each frame of the raw video as a PNG image in the directory
+    (the folder of the video by default), using the size and format
+    in its JSON file. Returns the number of saved images.
+    """
+    path = Path(path)
+    directory = Path(directory) if directory else path.parent
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".json")) as info_file:
+        info = json.load(info_file)
+    size, pitch = (info["width"], info["height"]), info["pitch"]
+    surface = pygame.Surface(size, 0, info["bitsize"], info["masks"] + [0])
+    frames = 0
+    with open(path, "rb") as raw_file:
+        while len(pixels := raw_file.read(pitch * size[1])) == pitch * size[1]:
+            buffer = surface.get_buffer()
+            if surface.get_pitch() == pitch:
+                buffer.write(pixels)
+            else:
+                # Copy the rows one by one if the padding is different
+                row = size[0] * surface.get_bytesize()
+                for y in range(size[1]):
+                    buffer.write(pixels[y * pitch:y * pitch + row],
+                                 y * surface.get_pitch())
+            del buffer
+            frames += 1
+            pygame.image.save(surface, str(directory / f"{frames:06d}.png"))
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert a captured raw video to PNG images.")
+    parser.add_argument("path", help="raw video recorded with --capture")
+    parser.add_argument("--output", metavar="DIR",
+                        help="folder of the images "
+                             "(default: the folder of the video)")
+    args = parser.parse_args(argv)
+    frames = convert(args.path, args.output)
+    print(f"Saved {frames} images")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
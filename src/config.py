@@ -10,6 +10,7 @@ purposes like loading the assets.
 Author: Fidel Jesus O. Surtida I
 --------------------------------------------------
 """
+import json
 from pathlib import Path
 from enum import Enum
 
@@ -27,13 +28,28 @@ class Config:
     SCREEN_WIDTH = 1024
     SCREEN_HEIGHT = 740
     SCREEN_DIMENSIONS = (SCREEN_WIDTH, SCREEN_HEIGHT)
+    FPS = 60
+
+    # SIMULATION CONSTANTS (tick rate and lag in seconds, --threaded)
+    SIM_THREADED = False
+    SIM_TICK_RATE = 60
+    SIM_MAX_LAG = 0.25
+
+    # GUI CONSTANTS
+    GUI_CACHE = True
 
     # SNAKE CONSTANTS
     SNAKE_SPEED = 4
     SNAKE_SIZE = 40
     SNAKE_LIFETIME = 100
 
+    # ARENA CONSTANTS (the arena can be larger than the screen)
+    ARENA_WIDTH = SCREEN_WIDTH
+    ARENA_HEIGHT = SCREEN_HEIGHT
+
     # FOOD CONSTANTS
+    FOOD_COUNT = 1
+    FOOD_BUFF_COUNT = 1
     FOOD_SIZE = 40
     FOOD_SPAWN_DELAY = 1000
     FOOD_BUFF_MIN_DELAY = 5000
@@ -41,15 +57,19 @@ class Config:
     FOOD_BUFF_LIFETIME = 4
 
     # POWERUP CONSTANTS (SPEEDUP)
+    SPEEDUP_COUNT = 1
     BUFF_DURATION = 10
     SPEEDUP_SIZE = 60
+    SPEEDUP_VALUE = 5
     SPEEDUP_LIFETIME = 6
     SPEEDUP_MIN_DELAY = 7000
     SPEEDUP_MAX_DELAY = 10000
 
     # DEBUFF CONSTANTS (SLOWDOWN)
+    SLOWDOWN_COUNT = 1
     SLOWDOWN_DURATION = 10
     SLOWDOWN_SIZE = 45
+    SLOWDOWN_VALUE = 2
     SLOWDOWN_LIFETIME = 5
     SLOWDOWN_MIN_DELAY = 2000
     SLOWDOWN_MAX_DELAY = 5000
@@ -63,15 +83,135 @@ class Config:
     BOMB_MIN_SPAWN_DELAY = 3
     BOMB_MAX_SPAWN_DELAY = 15
 
+    # LEADERBOARD CONSTANTS (the files are in the data directory unless
+    # absolute paths are set, like the temporary files of the benchmarks)
+    LEADERBOARD_PATH = "leaderboard.db"
+    LEADERBOARD_LEGACY_PATH = "leaderboard.bin"
+    LEADERBOARD_ROWS = 3
+    LEADERBOARD_MAX_RANK = 50
+    LEADERBOARD_REFRESH_DELAY = 1
+
+    # TRACER CONSTANTS (the newest events kept for the --trace file)
+    TRACE_MAX_EVENTS = 500_000
+
+    # PROFILER CONSTANTS (history in frames, toggled with F3)
+    PROFILER_ENABLED = False
+    PROFILER_HISTORY = 240
+
+    # WATCHDOG CONSTANTS (frame budget in milliseconds, also turned on
+    # with --hitch-budget)
+    WATCHDOG_ENABLED = False
+    WATCHDOG_BUDGET = 16.7
+    WATCHDOG_LOG_SIZE = 1024 * 1024
+    WATCHDOG_LOG_BACKUPS = 3
+
+    # GOVERNOR CONSTANTS (budget in milliseconds of work per frame)
+    # Each quality level from the best to the lowest sets the particle
+    # count fraction, the explosion frame step, the floater limit (None
+    # for no limit) and if the snake turn covers are created
+    GOVERNOR_ENABLED = True
+    GOVERNOR_BUDGET = 12.0
+    GOVERNOR_HEADROOM = 0.6
+    GOVERNOR_WINDOW = 60
+    GOVERNOR_RECOVERY = 3
+    GOVERNOR_LEVELS = (
+        {"particles": 1.0, "explosion_step": 1, "floaters": None,
+         "turn_covers": True},
+        {"particles": 0.5, "explosion_step": 1, "floaters": 24,
+         "turn_covers": True},
+        {"particles": 0.3, "explosion_step": 2, "floaters": 12,
+         "turn_covers": True},
+        {"particles": 0.15, "explosion_step": 2, "floaters": 6,
+         "turn_covers": False}
+    )
+
+    # DEATHCAM CONSTANTS (region in pixels, ring size is fps * seconds)
+    DEATHCAM_REGION = (320, 180)
+    DEATHCAM_SCALE = 0.5
+    DEATHCAM_FPS = 15
+    DEATHCAM_SECONDS = 3
+
+    # CAPTURE CONSTANTS (frames that can wait for the writer, --capture)
+    CAPTURE_BUFFERS = 8
+
+    # RENDERER CONSTANTS (surface blits or the SDL2 Renderer, --renderer)
+    RENDERER = "surface"
+
+    # STRESS PROFILE (replaces the counts above with --stress)
+    STRESS_PROFILE = {
+        "BOMB_COUNT": 300,
+        "FOOD_COUNT": 40,
+        "FOOD_BUFF_COUNT": 20,
+        "SPEEDUP_COUNT": 20,
+        "SLOWDOWN_COUNT": 20,
+        "ARENA_WIDTH": SCREEN_WIDTH * 3,
+        "ARENA_HEIGHT": SCREEN_HEIGHT * 3
+    }
+
     # BASE PATH
     BASE_PATH = Path(__file__).resolve().parent.parent
+    # Loaded GUI theme data (loaded once on first use)
+    THEME = None
+    # Class constants copied from the config values (see Config.bind)
+    BINDINGS = {}
+
+    @classmethod
+    def apply_profile(cls, profile):
+        """
+        Replaces the config values with the values of the profile.
+        The class constants bound to the values are replaced too.
+        Returns the previous values so the profile can be reverted.
+        """
+        previous = {name: getattr(cls, name) for name in profile}
+        for name, value in profile.items():
+            setattr(cls, name, value)
+            for owner, attribute in cls.BINDINGS.get(name, ()):
+                setattr(owner, attribute, value)
+        return previous
+
+    @classmethod
+    def bind(cls, **constants):
+        """
+        Class decorator that registers the class constants copied from
+        the config values when the class is created, for example
+        LIFETIME="SNAKE_LIFETIME". A profile applied after the import
+        then replaces these constants as well.
+        """
+        def register(owner):
+            for attribute, name in constants.items():
+                cls.BINDINGS.setdefault(name, []).append((owner, attribute))
+            return owner
+        return register
 
     @classmethod
     def theme_path(cls):
         """ Returns the absolute theme path file. """
         return str(cls.BASE_PATH / "data/theme.json")
 
+    @classmethod
+    def theme_block(cls, block_id):
+        """
+        Returns a block of the GUI theme file merged with the blocks
+        of its prototype. Returns an empty dict for unknown blocks.
+        """
+        if cls.THEME is None:
+            with open(cls.theme_path()) as theme_file:
+                cls.THEME = json.load(theme_file)
+        if block_id not in cls.THEME:
+            return {}
+        block = cls.THEME[block_id]
+        merged = cls.theme_block(block.get("prototype"))
+        for section, values in block.items():
+            if isinstance(values, dict):
+                merged[section] = {**merged.get(section, {}), **values}
+        return merged
+
     @classmethod
     def assets_path(cls, filename=""):
         """ Returns the absolute assets path directory. """
         return str(cls.BASE_PATH / "assets") + f"/{filename}"
+
+    @classmethod
+    def data_path(cls, filename=""):
+        """ Returns the absolute path of a file in the data directory. """
+        return cls.BASE_PATH / "data" / filename
@@ -0,0 +1,107 @@
+"""
+DeathCam Class - deathcam.py
+-----------------------------------------------------------
+This module contains the DeathCam Class that keeps the last
+few seconds of the game around the snake head, and plays
+them back as a loop in the last moments panel of the
+gameover screen. Only the region around the head is read
+from the screen, and it is scaled down straight into one of
+the surfaces of a ring that are created once, so recording
+a frame does not allocate a new surface and the memory of
+the ring never grows. The frames are recorded at a lower
+rate than the game is drawn.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import pygame
+from src.config import Config
+
+
+class DeathCam:
+
+    # Size of the region around the head and of its recorded frames
+    REGION = Config.DEATHCAM_REGION
+    SCALE = Config.DEATHCAM_SCALE
+    # Recorded frames per second and the seconds kept in the ring
+    FPS = Config.DEATHCAM_FPS
+    SECONDS = Config.DEATHCAM_SECONDS
+    # Seconds that the last frame is shown before the loop starts again
+    HOLD = 1
+
+    def __init__(self, screen):
+        """
+        Creates the ring of frame surfaces for the recording with the
+        pixel format of the display, so they can be scaled into. The
+        screen can also be a TextureCanvas, which is read as a copy.
+        """
+        size = (round(self.REGION[0] * self.SCALE),
+                round(self.REGION[1] * self.SCALE))
+        self._frames = [pygame.Surface(size).convert()
+                        for _ in range(round(self.FPS * self.SECONDS))]
+        self.reset()
+
+    def reset(self):
+        """ Forgets the recorded frames (for a new game). """
+        self._next = 0
+        self._count = 0
+        self._playing = None
+        self._time = 0
+        self._shown = None
+
+    def __len__(self):
+        """ Returns the number of recorded frames in the ring. """
+        return min(self._count, len(self._frames))
+
+    def region(self, surface, position):
+        """
+        Returns the region of the surface to record for the head at the
+        position. The head is a bit left and above the middle.
+        """
+        width, height = self.REGION
+        x, y = position
+        region = pygame.Rect(x - width // 3 - 20, y - height // 3,
+                             width, height)
+        return region.clamp(surface.get_rect())
+
+    def record(self, surface, position, time, *, force=False):
+        """
+        Scales down the region around the position into the next frame
+        of the ring. Only records if the time (the seconds played) has
+        reached the next frame, unless force is True.
+        """
+        if time < self._next and not force:
+            return
+        self._next = time + 1 / self.FPS
+        frame = self._frames[self._count % len(self._frames)]
+        area = surface.subsurface(self.region(surface, position))
+        pygame.transform.scale(area, frame.get_size(), frame)
+        self._count += 1
+
+    def frames(self):
+        """ Returns the recorded frames from the oldest to the newest. """
+        start = self._count - len(self)
+        return [self._frames[i % len(self._frames)]
+                for i in range(start, self._count)]
+
+    def play(self):
+        """ Starts the playback loop of the recorded frames. """
+        self._playing = self.frames()
+        self._time = 0
+        self._shown = None
+
+    def update(self, time_delta):
+        """
+        Advances the playback loop. Returns the frame to show if it has
+        changed since the last update, else None.
+        """
+        if not self._playing:
+            return None
+        length = len(self._playing)
+        self._time = (self._time + time_delta) % (length / self.FPS +
+                                                  self.HOLD)
+        index = min(int(self._time * self.FPS), length - 1)
+        if index == self._shown:
+            return None
+        self._shown = index
+        return self._playing[index]
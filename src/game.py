@@ -9,13 +9,21 @@ calls object methods accordingly.
 Author: Fidel Jesus O. Surtida I
 -----------------------------------------------------------
 """
+import contextlib
 import pygame
 import pygame_gui
-import random
-import marshal
-from interface import Interface
+from src.autopilot import Autopilot
+from src.camera import Camera, TiledBackground
 from src.config import Config
 from src.config import GAMESTATE
+from src.deathcam import DeathCam
+from src.governor import QualityGovernor
+from src.interface import Interface
+from src.interpolation import Interpolation
+from src.leaderboard import Leaderboard
+from src.profiler import FrameProfiler
+from src.timers import Timers
+from src.tracer import probe
 from src.objects.snake import Snake
 from src.objects.food import Food
 from src.objects.foodbuff import FoodBuff
@@ -34,27 +42,39 @@ class Game:
         self.WIDTH = Config.SCREEN_WIDTH
         self.screen = screen
         self.manager = manager
+        # Guards the screen while updating (replaced in the threaded mode)
+        self.screen_lock = contextlib.nullcontext()
         self.state = GAMESTATE.MENU
-        self.bounderies = pygame.Rect(10, 10, self.WIDTH - 20, self.HEIGHT - 20)
+        # The arena can be larger than the screen (stress profile)
+        self.ARENA_WIDTH = Config.ARENA_WIDTH
+        self.ARENA_HEIGHT = Config.ARENA_HEIGHT
+        self.bounderies = pygame.Rect(10, 10, self.ARENA_WIDTH - 20,
+                                      self.ARENA_HEIGHT - 20)
+        # The camera shows the part of the arena around the snake head
+        self.camera = Camera(screen.get_size(),
+                             (0, 0, self.ARENA_WIDTH, self.ARENA_HEIGHT))
 
         # Initialize the game interface manager
         self.interface = Interface(screen, manager)
+        # Records the last seconds around the snake head for the gameover
+        self.deathcam = DeathCam(screen)
         # Load the game background and the panel image
         self._load_game_backgrounds()
         # These variables are used for various flags regarding the snake
-        self._auto_path_counter = 0
         self._gameover_counter = 0.15
         self._interface_gameover_delay = 0.2
-        self._uturn = None
+        # The autopilot steers the snake in the menu (and PLAY if enabled)
+        self.autopilot = Autopilot(self.bounderies)
+        self.autopilot_play = False
+        # The bot policy that plays the game (see src/policy.py)
+        self.policy = None
+        self._policy_tile = None
         # Create the Snake object as the player and pass the game background
         self.snake = Snake(background=self.bgwalled)
-        # Create a starting Food Object (creation at play button press)
-        self.apple = None
-        self.golden_apple = None
-        # Create the starting item buffs (creation at play button press)
-        self.speedup = None
-        # Create the debuff items (creation at play button press)
-        self.slowdown = None
+        # Create the starting Food Objects (creation at play button press)
+        self.foods = []
+        # Create the buff and debuff items (creation at play button press)
+        self.items = []
         # Create and initialize the bombs based on config count
         self.bombs = []
         for _ in range(Config.BOMB_COUNT):
@@ -62,14 +82,17 @@ class Game:
         # Score and total time of the current game
         self.score = 0
         self.total_time = 0
-        # Create the empty list of leaderboard entries
-        self.lb_data = []
-        # Load the leaderboard data if it's available in data folder
-        lb_path = Config.BASE_PATH / "data/leaderboard.bin"
-        if lb_path.exists():
-            self.lb_data = marshal.loads(lb_path.read_bytes())
+        # Bombs hit and the cause of the game over (for the bot runners)
+        self.bomb_hits = 0
+        self.death_cause = None
+        # Open the leaderboard database (imports the old leaderboard.bin)
+        self.leaderboard = Leaderboard(
+            Config.data_path(Config.LEADERBOARD_PATH),
+            legacy_path=Config.data_path(Config.LEADERBOARD_LEGACY_PATH)
+        )
+        self._leaderboard_refresh = Config.LEADERBOARD_REFRESH_DELAY
         # Initialize the leaderboard GUI
-        self.interface.update_leaderboard_data(self.lb_data[:3])
+        self.interface.update_leaderboard_data(self.leaderboard)
 
     def _load_game_backgrounds(self):
         """ Loads the background image and the walls on each window. """
@@ -81,13 +104,17 @@ class Game:
         self.wall_bottom = pygame.transform.rotate(self.wall_top, 180)
         self.wall_left = pygame.transform.rotate(self.wall_top, 90)
         self.wall_right = pygame.transform.rotate(self.wall_top, -90)
-        # Create a walled background for the snake
-        self.bgwalled = pygame.Surface((self.WIDTH, self.HEIGHT))
-        self.bgwalled.blit(self.bg, (0, 0))
-        self.bgwalled.blit(self.wall_left, (0, 0))
-        self.bgwalled.blit(self.wall_right, (self.WIDTH - 25, 0))
-        self.bgwalled.blit(self.wall_top, (15, 0))
-        self.bgwalled.blit(self.wall_bottom, (15, self.HEIGHT - 22))
+        # Create a walled background of the whole arena for the snake
+        # The background and the walls are tiles repeated over the arena
+        width, height = self.ARENA_WIDTH, self.ARENA_HEIGHT
+        walls = []
+        for y in range(0, height, self.wall_left.get_height()):
+            walls.append((self.wall_left, (0, y)))
+            walls.append((self.wall_right, (width - 25, y)))
+        for x in range(15, width, self.wall_top.get_width()):
+            walls.append((self.wall_top, (x, 0)))
+            walls.append((self.wall_bottom, (x, height - 22)))
+        self.bgwalled = TiledBackground(self.bg, (width, height), walls)
 
     def reset_game(self):
         """
@@ -97,63 +124,81 @@ class Game:
         self.snake = Snake(background=self.bgwalled)
         self._gameover_counter = 0.15
         self._interface_gameover_delay = 0.2
-        self._auto_path_counter = 0
-        self._uturn = False
+        self.autopilot.reset()
+        self.deathcam.reset()
+        self._policy_tile = None
         self.score = 0
         self.total_time = 0
+        self.bomb_hits = 0
+        self.death_cause = None
         # Destroy and reset all bombs
         for bomb in self.bombs:
             bomb.reset()
 
+    @probe
     def update(self, time_delta):
         """
         Handles the game logic. Updates the game objects and status.
         This also is passed the time_delta computation from the main loop.
         """
+        # Count the ticks so the drawing knows which objects moved
+        Interpolation.tick += 1
+        # Update the spawn timers of the game objects
+        Timers.update(time_delta)
+
         # HANDLE MENU UPDATES
         if self.state == GAMESTATE.MENU:
             # Update the snake for the menu auto path
             self.snake_menu_auto_path_update(time_delta)
+            # Show the scores saved by the other game instances
+            self.leaderboard_refresh_update(time_delta)
 
         # HANDLE PLAY UPDATES
         elif self.state == GAMESTATE.PLAY:
+            # Let the autopilot or a bot policy play the game
+            if self.autopilot_play:
+                self.snake_menu_auto_path_update(time_delta)
+            elif self.policy:
+                self.snake_policy_update()
             # Reduce the life of the player based on the passed time
             self.snake.lifetime -= time_delta
             self.total_time += time_delta
             self.interface.update_lifetime(max(0, self.snake.lifetime))
 
-            # Update the snake if it collides with the food and eats it
-            self.snake_eat_food_update(self.apple)
-            self.snake_eat_food_update(self.golden_apple)
-
-            # Update the snake if it collides with the items and eats it
-            self.snake_eat_items_update(self.speedup)
-            self.snake_eat_items_update(self.slowdown)
+            with FrameProfiler.stage("collision"):
+                # Update the snake if it collides with the food and eats it
+                for food in self.foods:
+                    self.snake_eat_food_update(food)
 
-            # Update the snake if it collides with the bombs
-            self.snake_collide_bombs_update()
+                # Update the snake if it collides with the items and eats it
+                for item in self.items:
+                    self.snake_eat_items_update(item)
 
-            # Update the food objects for its animation states
-            self.apple.update(time_delta)
-            self.golden_apple.update(time_delta)
+                # Update the snake if it collides with the bombs
+                self.snake_collide_bombs_update()
 
-            # Check if the snake head collides with its body parts
-            self.snake_collide_self_checker(time_delta)
-            # Check if the snake collides with the window bounderies
-            self.snake_bump_bounderies_update()
+                # Check if the snake head collides with its body parts
+                self.snake_collide_self_checker(time_delta)
+                # Check if the snake collides with the window bounderies
+                self.snake_bump_bounderies_update()
 
-            # Update the buff items for animation states
-            self.speedup.update(time_delta)
-            # Update the debuff items for animation states
-            self.slowdown.update(time_delta)
+            with FrameProfiler.stage("food"):
+                # Update the food objects for its animation states
+                for food in self.foods:
+                    food.update(time_delta)
+                # Update the buff and debuff items for animation states
+                for item in self.items:
+                    item.update(time_delta)
 
             # Update the instantiated bombs on PLAY States
-            for bomb in self.bombs:
-                bomb.update(time_delta)
+            with FrameProfiler.stage("bombs"):
+                for bomb in self.bombs:
+                    bomb.update(time_delta)
 
             # Reduce the gameover counter if the lifetime of snake reaches 0
             if self.snake.lifetime <= 0:
                 self._gameover_counter -= time_delta
+                self.death_cause = self.death_cause or "lifetime"
 
             # Call the gameover event if the counter reaches 0
             if self._gameover_counter <= 0:
@@ -166,15 +211,22 @@ class Game:
                 self._interface_gameover_delay = counter
             elif self._interface_gameover_delay == 0:
                 self.show_gameover_screen()
+            # Play the next frame of the deathcam loop
+            frame = self.deathcam.update(time_delta)
+            if frame is not None:
+                self.interface.update_moments_image(
+                    frame, int(self.snake.lifetime))
 
         # UPDATE MOVEMENT OF SNAKE IN MENU AND PLAY STATES
         if self.state == GAMESTATE.MENU or self.state == GAMESTATE.PLAY:
             # Update the movement of the snake
-            self.snake.update(time_delta)
+            with FrameProfiler.stage("snake"):
+                self.snake.update(time_delta)
 
         # Update the Interface Manager for animation of some elements
         self.interface.update()
 
+    @probe
     def game_events(self):
         """
         Handles the pygame events (QUIT and keyboard events).
@@ -183,23 +235,38 @@ class Game:
         """
         # HELPER FUNCTIONS FOR THE GAME EVENTS
         def instantiate_foods():
-            self.apple = Food(filename="apple.png", points=10, regen=2)
-            self.golden_apple = FoodBuff(filename="goldapple.png",
-                                         points=50, regen=5)
+            # Remove the spawn timers of the previous foods of this game
+            Timers.clear(self.foods)
+            self.foods = [Food(filename="apple.png", points=10, regen=2)
+                          for _ in range(Config.FOOD_COUNT)]
+            self.foods += [FoodBuff(filename="goldapple.png",
+                                    points=50, regen=5)
+                           for _ in range(Config.FOOD_BUFF_COUNT)]
 
         def instantiate_items():
-            self.speedup = SpeedUp(name="speedup", filename="speedup.png",
-                                   points=20, value=5, negative=False)
-            self.slowdown = SlowDown(name="slowdown", filename="snail.png",
-                                     points=10, value=2, negative=True)
+            # Remove the spawn timers of the previous items of this game
+            Timers.clear(self.items)
+            self.items = [SpeedUp(name="speedup", filename="speedup.png",
+                                  points=20, value=Config.SPEEDUP_VALUE,
+                                  negative=False)
+                          for _ in range(Config.SPEEDUP_COUNT)]
+            self.items += [SlowDown(name="slowdown", filename="snail.png",
+                                    points=10, value=Config.SLOWDOWN_VALUE,
+                                    negative=True)
+                           for _ in range(Config.SLOWDOWN_COUNT)]
 
         def all_territories():
-            return ([self.apple.territory, self.golden_apple.territory,
-                    self.speedup.territory, self.slowdown.territory] +
-                    self.snake.rects)
+            return ([obj.territory for obj in self.foods + self.items] +
+                    list(self.snake.rects))
 
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            # Toggle the frame profiler overlay
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                FrameProfiler.toggle()
+
+            # The window of the TextureCanvas only sends the WINDOWCLOSE
+            # The leaderboard is closed by main after the last update
+            if event.type in (pygame.QUIT, pygame.WINDOWCLOSE):
                 return False
 
             # GUI Manager pass each event to the pygame_gui
@@ -252,90 +319,107 @@ class Game:
                     self.interface.main_menu_event()
                     self.reset_game()
 
-            # SPAWN FOOD EVENT
+            # SPAWN FOOD EVENT (the timer event owner is the object to spawn)
             if self.state == GAMESTATE.PLAY:
-                if event.type == Food.SPAWN_FOOD_EVENT:
-                    self.apple.spawn(off_limits_rects=all_territories())
-                if event.type == FoodBuff.SPAWN_FOOD_BUFF_EVENT:
-                    self.golden_apple.spawn(off_limits_rects=all_territories())
+                with FrameProfiler.stage("spawns"):
+                    if event.type in (Food.SPAWN_FOOD_EVENT,
+                                      FoodBuff.SPAWN_FOOD_BUFF_EVENT):
+                        event.owner.spawn(off_limits_rects=all_territories())
 
             # SPAWN ITEMS EVENT
             if self.state == GAMESTATE.PLAY:
-                if event.type == SpeedUp.SPAWN_SPEED_UP_EVENT:
-                    self.speedup.spawn(off_limits_rects=all_territories())
-                if event.type == SlowDown.SPAWN_SLOW_DOWN_EVENT:
-                    territory = all_territories()
-                    self.slowdown.spawn_near_head(head=self.snake.head,
-                                                  off_limits_rects=territory)
+                with FrameProfiler.stage("spawns"):
+                    if event.type == SpeedUp.SPAWN_SPEED_UP_EVENT:
+                        event.owner.spawn(off_limits_rects=all_territories())
+                    if event.type == SlowDown.SPAWN_SLOW_DOWN_EVENT:
+                        territory = all_territories()
+                        event.owner.spawn_near_head(head=self.snake.head,
+                                                    off_limits_rects=territory)
 
         return True
 
-    def draw(self):
+    @probe
+    def draw(self, surface=None):
         """
-        Draws the game objects on the screen.
+        Draws the game objects on the screen. Another surface like
+        object (the DisplayList of the threaded mode) can be passed.
         """
-        # Draw the background first
-        self.screen.blit(self.bg, (0, 0))
-        # Draw the walls on every boundery of the screen
-        self.screen.blit(self.wall_left, (0, 0))
-        self.screen.blit(self.wall_right, (self.WIDTH - 25, 0))
-        self.screen.blit(self.wall_top, (15, 0))
-        self.screen.blit(self.wall_bottom, (15, self.HEIGHT - 22))
+        if surface is None:
+            surface = self.screen
+        # Follow the snake head, the objects outside the camera are skipped
+        head, size = self.snake.head, self.snake.head.rect.size
+        position = head.position
+        self.camera.follow((position[0] + size[0] / 2,
+                            position[1] + size[1] / 2))
+        surface = self.camera.view(surface)
+        # Draw the walled background of the arena first
+        self.bgwalled.draw(surface)
 
         # Draw the snake which is available in any MODE
-        self.snake.draw(self.screen)
+        self.snake.draw(surface)
 
         # Draw game objects that are only viewable in PLAY mode
         if self.state == GAMESTATE.PLAY or self.state == GAMESTATE.GAMEOVER:
-            # Draw the available bombs
+            # Draw the available bombs near the camera (with explosions)
             for bomb in self.bombs:
-                bomb.draw(self.screen)
-            # Draw the powerups and items
-            self.apple.draw(self.screen)
-            self.golden_apple.draw(self.screen)
-            self.speedup.draw(self.screen)
-            self.slowdown.draw(self.screen)
+                if bomb.rect is not None and self.camera.sees(
+                        bomb.rect, Bomb.EXPLOSION_SIZE):
+                    bomb.draw(surface)
+            # Draw the foods, powerups and items
+            for obj in self.foods + self.items:
+                obj.draw(surface)
 
         # Draw the GUI elements from Inteface
-        self.interface.draw()
+        self.interface.draw(surface)
+
+    def deathcam_target(self):
+        """
+        Returns the screen position of the snake head and the time played
+        to record the deathcam with, or None if it is not in PLAY. This
+        must be taken while the game is not updated (with the snapshot
+        in the threaded mode).
+        """
+        if self.state == GAMESTATE.PLAY:
+            position = self.camera.to_screen(self.snake.head.bounds.topleft)
+            return position, self.total_time
+        return None
+
+    def deathcam_update(self, target):
+        """
+        Records the region around the snake head from the drawn screen
+        for the deathcam. This is called after the game is drawn, with
+        the target returned by deathcam_target.
+        """
+        if target is not None:
+            self.deathcam.record(self.screen, *target)
 
     def snake_menu_auto_path_update(self, time_delta):
         """
-        This will randomize the movement of the snake in the menu.
-        It must not go over the bounderies of the window
-        Every second it will randomize a direction of the head.
-        """
-        xhead, yhead = self.snake.head.bounds.topleft
-        direction = self.snake.head.direction
-        topmax, botmax = 80, self.HEIGHT - 120
-        leftmax, rightmax = 80, self.WIDTH - 120
-
-        if not self._uturn and (yhead < topmax or yhead > botmax):
-            self.snake.move(random.choice([Snake.LEFT, Snake.RIGHT]))
-            self._auto_path_counter = 0.3
-            self._uturn = [Snake.DOWN] if yhead < topmax else [Snake.UP]
-
-        if not self._uturn and (xhead < leftmax or xhead > rightmax):
-            self.snake.move(random.choice([Snake.UP, Snake.DOWN]))
-            self._auto_path_counter = 0.3
-            self._uturn = [Snake.RIGHT] if xhead < leftmax else [Snake.LEFT]
-
-        if self._auto_path_counter >= 0.7:
-            # Remove the current direction and its opposite direction
-            moves = [Snake.UP, Snake.DOWN, Snake.LEFT, Snake.RIGHT]
-            if self._uturn:
-                moves = self._uturn
-            else:
-                to_remove = [direction, direction * -1]
-                moves = [move for move in moves if move not in to_remove]
-
-            # Randomize the next valid moves
-            next_move = random.choice(moves)
-            self.snake.move(next_move)
-            self._auto_path_counter = -0.3 if self._uturn else 0
-            self._uturn = None
-
-        self._auto_path_counter += time_delta
+        This will steer the snake in the menu (and in PLAY when the
+        autopilot is turned on). The autopilot plans a path on the grid
+        toward the food, or a random tile in the menu, and keeps away
+        from the bounderies, the bombs and the snake body.
+        """
+        if self.state == GAMESTATE.PLAY:
+            self.autopilot.steer(self.snake, foods=self.foods,
+                                 bombs=self.bombs)
+        else:
+            self.autopilot.steer(self.snake)
+
+    def snake_policy_update(self):
+        """
+        Asks the bot policy for the next direction once for each tile
+        the snake head reaches, when the head is allowed to turn.
+        """
+        snake = self.snake
+        if snake.dead or not snake.can_turn:
+            return
+        if snake.tiles == self._policy_tile:
+            return
+        self._policy_tile = snake.tiles
+        direction = self.policy.act(self)
+        if direction is not None:
+            snake.move(direction)
 
     def snake_eat_food_update(self, food):
         """
@@ -368,7 +452,7 @@ class Game:
             if self.snake.head.bounds.colliderect(item.bounds):
                 # Display a buff icon and points floater
                 item_pos = pygame.Vector2(item.bounds.topleft)
-                self.interface.spawn_buff_label(buff_icon=item.image.copy(),
+                self.interface.spawn_buff_label(buff_icon=item.image,
                                                 position=item_pos,
                                                 buff_value=item.value,
                                                 points=item.points,
@@ -397,12 +481,14 @@ class Game:
                                                 deduction=bomb.deduction)
                 # Reduce the score and health then update the labels
                 self.snake.trigger_damaged()
+                self.bomb_hits += 1
                 self.score = max(0, self.score - bomb.deduction)
                 self.snake.lifetime = max(0, self.snake.lifetime - bomb.damage)
                 self.interface.update_score(self.score)
                 # If lifetime reaches 0 then reconfig the gameover counter
                 if self.snake.lifetime <= 0:
                     self._gameover_counter = 0.35
+                    self.death_cause = "bomb"
                 # Destroy the bomb to respawn it again
                 bomb.destroy()
                 break
@@ -417,9 +503,10 @@ class Game:
         snake_head = self.snake.head
         if snake_head.bounds.clamp(self.bounderies) != snake_head.bounds:
             self._gameover_counter = 0
+            self.death_cause = "wall"
             # Instant hide the game panel if the collision is on top bounds
-            if self.snake.head.rect.y < 70:
-                self.interface.game_panel.hide()
+            if self.camera.to_screen(self.snake.head.rect.topleft)[1] < 70:
+                self.interface.hide_game_panel()
 
     def snake_collide_self_checker(self, time_delta):
         """
@@ -431,6 +518,8 @@ class Game:
             if self.snake.head.bounds.colliderect(body.bounds):
                 counter = max(0, self._gameover_counter - time_delta)
                 self._gameover_counter = counter
+                if counter == 0:
+                    self.death_cause = "self"
                 break
 
     def set_gameover_event(self):
@@ -448,7 +537,8 @@ class Game:
 
         # Set the dead image sprite of the snake head
         self.snake.die()
-        self.snake.draw(self.screen)
+        with self.screen_lock:
+            self.snake.draw(self.camera.view(self.screen))
 
         # Pass the final game data to the results panel
         self.interface.update_results_data(score=self.score,
@@ -461,36 +551,52 @@ class Game:
         the GAMEOVER flag. This allows the game to update and remove
         remaining game UI and effects
         """
-        # Set the moments image of the snake in the gameover screen
-        width, height, (x, y) = 320, 180, self.snake.head.bounds.topleft
-        snakepos = (x - (width // 3) - 20, y - (height // 3))
-        moments_rect = pygame.Rect(*snakepos, width, height)
-        moments_rect = moments_rect.clamp(self.screen.get_rect())
-        moments = self.screen.subsurface(moments_rect)
-        life_left = int(self.snake.lifetime)
-        self.interface.update_moments_image(moments, life_left)
+        # Record the dead snake as the last frame and play the deathcam
+        with self.screen_lock:
+            position = self.camera.to_screen(self.snake.head.bounds.topleft)
+            self.deathcam.record(self.screen, position, self.total_time,
+                                 force=True)
+        self.deathcam.play()
 
         # Finally set the interface to gameover
         self._interface_gameover_delay = -1
         self.interface.gameover_event()
 
+    def leaderboard_refresh_update(self, time_delta):
+        """
+        Every refresh delay, check if other game instances sharing the
+        leaderboard file saved new entries and update the menu UI.
+        """
+        self._leaderboard_refresh -= time_delta
+        if self._leaderboard_refresh <= 0:
+            self._leaderboard_refresh = Config.LEADERBOARD_REFRESH_DELAY
+            if self.leaderboard.refresh():
+                self.interface.update_leaderboard_data(self.leaderboard)
+
+    @probe
     def update_leaderboard_data(self):
         """
-        This method will add a new leaderboard data and sort it by descending
-        order of scores to show the top 3 in the leaderboard UI.
-        The data that it will get will be the current status of the game.
-        """
-        # Get the current game stats
-        data = {"name": self.interface.get_player_name(),
-                "score": self.score, "stretch": self.snake.stretch,
-                "lifetime": int(self.total_time)}
-        # Append it to current lb_data variable
-        self.lb_data.append(data)
-        # Sort it by score
-        self.lb_data.sort(key=lambda x: x["score"], reverse=True)
-        # Pass the top 3 to the interface leaderboard UI generator
-        self.interface.update_leaderboard_data(self.lb_data[:3])
-        # Parse the leaderboard data to json and save it in file
-        byte_data = marshal.dumps(self.lb_data)
-        save_path = Config.BASE_PATH / "data/leaderboard.bin"
-        save_path.write_bytes(byte_data)
+        This method will save the current status of the game as a new
+        leaderboard entry. The leaderboard UI then pages through the
+        database to show the top entries sorted by score.
+        """
+        # Save the current game stats
+        self.leaderboard.add(name=self.interface.get_player_name(),
+                             score=self.score, stretch=self.snake.stretch,
+                             lifetime=int(self.total_time))
+        # Refresh the interface leaderboard UI from the database
+        self.interface.update_leaderboard_data(self.leaderboard)
+
+    def debug_context(self):
+        """
+        Returns the current game values used for debugging logs like the
+        state, snake length and the number of live bombs and particles.
+        """
+        particles = sum(len(obj.particles.particles or [])
+                        for obj in self.foods + self.items)
+        bombs = sum(1 for bomb in self.bombs if bomb.spawned or bomb.exploding)
+        return {"state": self.state.name,
+                "snake_length": len(self.snake.body) + 1,
+                "bombs": bombs, "particles": particles,
+                "floaters": self.interface.floater_count,
+                "quality": QualityGovernor.level}
@@ -0,0 +1,98 @@
+"""
+QualityGovernor Class - governor.py
+-----------------------------------------------------------
+This module contains the QualityGovernor Class that keeps
+the game inside its frame budget on slow computers. It
+measures the work time of each frame (without the wait of
+the FPS limit) and every window of frames it checks the
+90th percentile. If it is over the budget, the quality is
+lowered by one level: fewer particles, fewer explosion
+frames, fewer floaters and no snake turn covers. When the
+frames are well under the budget for a few windows in a
+row, the quality is raised again by one level.
+The game objects read the settings of the current level
+from the class attributes.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import time
+from src.config import Config
+from src.profiler import FrameProfiler
+
+
+class QualityGovernor:
+
+    # Quality levels and the frame budget settings from Config
+    LEVELS = Config.GOVERNOR_LEVELS
+    BUDGET = Config.GOVERNOR_BUDGET
+    HEADROOM = Config.GOVERNOR_HEADROOM
+    WINDOW = Config.GOVERNOR_WINDOW
+    RECOVERY = Config.GOVERNOR_RECOVERY
+
+    # Settings of the current quality level (the best by default)
+    enabled = False
+    level = 0
+    particles = 1.0
+    explosion_step = 1
+    floaters = None
+    turn_covers = True
+
+    # Frame times of the current window
+    _frames = []
+    _frame_start = None
+    _good_windows = 0
+
+    @classmethod
+    def enable(cls):
+        """ Starts watching the frames from the best quality level. """
+        cls.enabled = True
+        cls._frames = []
+        cls._good_windows = 0
+        cls.set_level(0)
+
+    @classmethod
+    def set_level(cls, level):
+        """ Sets the settings of the quality level (0 is the best). """
+        cls.level = max(0, min(len(cls.LEVELS) - 1, level))
+        for name, value in cls.LEVELS[cls.level].items():
+            setattr(cls, name, value)
+
+    @classmethod
+    def frame_start(cls):
+        """ Saves the start time of the work of this frame. """
+        if cls.enabled:
+            cls._frame_start = time.perf_counter()
+
+    @classmethod
+    def frame_end(cls):
+        """
+        Saves the work time of this frame and changes the quality
+        level when a window of frames is complete.
+        """
+        if not cls.enabled or cls._frame_start is None:
+            return
+        cls._frames.append((time.perf_counter() - cls._frame_start) * 1000)
+        cls._frame_start = None
+        if len(cls._frames) >= cls.WINDOW:
+            cls._check_window()
+
+    @classmethod
+    def _check_window(cls):
+        """
+        Lowers the quality at once if the window is over the budget.
+        The quality is only raised after RECOVERY windows in a row with
+        headroom, so it does not go up and down every window.
+        """
+        p90 = FrameProfiler.percentiles(cls._frames, 90)[0]
+        cls._frames = []
+        if p90 > cls.BUDGET:
+            cls._good_windows = 0
+            cls.set_level(cls.level + 1)
+        elif p90 < cls.BUDGET * cls.HEADROOM:
+            cls._good_windows += 1
+            if cls._good_windows >= cls.RECOVERY:
+                cls._good_windows = 0
+                cls.set_level(cls.level - 1)
+        else:
+            cls._good_windows = 0
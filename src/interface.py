@@ -4,15 +4,43 @@ Interface Class - interface.py
 This module contains the Interface Class that is responsible
 for initializing game elements like lables, buttons and
 panels that will be used and displayed by the GUI Manager.
+The GUI Manager is only used by one thread. In the threaded
+mode the GUI changes of the simulation thread are queued
+and run on the main thread when the GUI is updated.
 -----------------------------------------------------------
 Author: Fidel Jesus O. Surtida I
 -----------------------------------------------------------
 """
+import functools
+import queue
+import threading
 import pygame
 import pygame_gui
+from pygame_gui.core.interfaces import IContainerLikeInterface
 from src.config import Config
 from src.config import GAMESTATE
-from src.objects.floater import Floater
+from src.objects.floater import FloaterLayer
+from src.objects.glyphs import HudCounter
+from src.tracer import probe
+
+
+def gui_call(method):
+    """
+    Marks the Interface methods that change the GUI elements. If the
+    calls are deferred, the calls from the other threads are queued for
+    the GUI thread instead, and a call from the GUI thread first runs the
+    queued calls so they stay in order.
+    """
+    @functools.wraps(method)
+    def call(self, *args, **kwargs):
+        if self._gui_thread is None:
+            return method(self, *args, **kwargs)
+        if threading.get_ident() != self._gui_thread:
+            self._gui_calls.put((method, args, kwargs))
+            return None
+        self.run_gui_calls()
+        return method(self, *args, **kwargs)
+    return call
 
 
 class Interface:
@@ -27,6 +55,11 @@ class Interface:
         self.state = GAMESTATE.MENU
         self._WIDTH = screen.get_width()
         self._HEIGHT = screen.get_height()
+        # Bumped by the setters that change the images of the game panel
+        self._gui_version = 0
+        # Thread that runs the GUI calls of the other threads (if deferred)
+        self._gui_thread = None
+        self._gui_calls = queue.SimpleQueue()
 
         # Load first the icons image for later subsurface use
         self.icons = pygame.image.load(Config.assets_path("icons.png"))
@@ -36,10 +69,22 @@ class Interface:
         self._initialize_play_elements()
         # Initialize all the GUI elements for GAMEOVER state
         self._initialize_gameover_elements()
-        # Container for tracking all the floaters that will be spawned
-        self._floaters = []
+        # Layer for tracking all the floaters that will be spawned
+        self._floaters = FloaterLayer()
         # Create a name flag for saving the player name
         self._saved_name = None
+        # Panels that are updated and drawn by the manager in each state
+        self._state_panels = {
+            GAMESTATE.MENU: [self.menu_panel],
+            GAMESTATE.PLAY: [self.game_panel],
+            GAMESTATE.GAMEOVER: [self.gameover_panel, self.game_panel]
+        }
+        self._detached = {}
+        # Cached GUI surface and the signature of the last drawn widgets
+        self._gui_surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        self._gui_signature = None
+        self._gui_area = pygame.Rect(0, 0, 0, 0)
+        self._attach_state_panels()
 
     def _initialize_menu_elements(self):
         """
@@ -79,8 +124,7 @@ class Interface:
         )
 
         # Create the leaderboard items. Call the helper method
-        data = [None, None, None]
-        self._initialize_leaderboard_items(data)
+        self._initialize_leaderboard_items()
 
         # Create the Start Button of the Menu
         lb_y = self.leaderboard_panel.rect.bottom
@@ -105,15 +149,18 @@ class Interface:
             container=self.menu_panel
         )
 
-    def _initialize_leaderboard_items(self, data):
+    def _initialize_leaderboard_items(self):
         """
-        This will be called to recreate the leaderboard elements based
-        on the saved highscore data file.
+        This will be called once to create the leaderboard row elements.
+        The rows are reused when the data changes or when the list is
+        scrolled, only the labels with a different value are updated.
         """
-        # Create the panel list to save the references
-        self.entry_panels = []
+        # Create the row list to save the references of the labels
+        self._leaderboard_rows = []
+        self._leaderboard = None
+        self._leaderboard_offset = 0
         # Create the medal icons
-        medals = [
+        self._medals = [
             self.icons.subsurface(1, 117, 27, 27),
             self.icons.subsurface(35, 119, 27, 28),
             self.icons.subsurface(63, 118, 27, 27)
@@ -123,8 +170,8 @@ class Interface:
         name_width, stats_width, rank_width = 150, 80, 50
         entry_y, lbl_height = hlbitem - 3, 35
 
-        # Loop throught the data and create each an entry item UI
-        for rank, player in enumerate(data, start=1):
+        # Create each entry item UI based on the number of visible rows
+        for rank in range(1, Config.LEADERBOARD_ROWS + 1):
             # Create the leaderboard entry panel container
             entry_panel = pygame_gui.elements.UIPanel(
                 relative_rect=pygame.Rect(3, entry_y, item_width, hlbitem),
@@ -132,21 +179,21 @@ class Interface:
                 container=self.leaderboard_panel, object_id="@entry_panel"
             )
             # Create the medal image
-            pygame_gui.elements.UIImage(
+            medal = pygame_gui.elements.UIImage(
                 relative_rect=pygame.Rect(15, 5, 25, 25),
-                image_surface=medals[rank-1], container=entry_panel
+                image_surface=self._medals[(rank - 1) % 3],
+                container=entry_panel
             )
             # Create the position label
-            pygame_gui.elements.UILabel(
+            rank_label = pygame_gui.elements.UILabel(
                 relative_rect=pygame.Rect(35, 0, rank_width, lbl_height),
                 text=f"{rank}", container=entry_panel,
                 object_id="@rank_labels"
             )
             # Create the player name label
-            player_name = player["name"] if player else "-----"
             name_label = pygame_gui.elements.UILabel(
                 relative_rect=pygame.Rect(95, 0, name_width, lbl_height),
-                text=player_name, container=entry_panel,
+                text="-----", container=entry_panel,
                 object_id="@entry_labels"
             )
             # Create the score icon image
@@ -158,10 +205,9 @@ class Interface:
             )
             # Create the score label
             x = score_img.relative_rect.right + 10
-            player_score = player["score"] if player else "-----"
             score_label = pygame_gui.elements.UILabel(
                 relative_rect=pygame.Rect(x, 0, stats_width, lbl_height),
-                text=f"{player_score}", container=entry_panel,
+                text="-----", container=entry_panel,
                 object_id="@entry_num_labels"
             )
             # Create the lifetime icon image
@@ -173,10 +219,9 @@ class Interface:
             )
             # Create the lifetime label
             x = lifetime_img.relative_rect.right + 10
-            player_lifetime = f"{player["lifetime"]}s" if player else "-----"
             lifetime_label = pygame_gui.elements.UILabel(
                 relative_rect=pygame.Rect(x, 0, stats_width, lbl_height),
-                text=player_lifetime, container=entry_panel,
+                text="-----", container=entry_panel,
                 object_id="@entry_num_labels"
             )
             # Create the stretch icon image
@@ -188,14 +233,18 @@ class Interface:
             )
             # Create the stretch label
             x = stretch_img.relative_rect.right + 10
-            player_stretch = f"{player["stretch"]}m" if player else "-----"
-            pygame_gui.elements.UILabel(
+            stretch_label = pygame_gui.elements.UILabel(
                 relative_rect=pygame.Rect(x, 0, stats_width, lbl_height),
-                text=player_stretch, container=entry_panel,
+                text="-----", container=entry_panel,
                 object_id="@entry_num_labels"
             )
-            # append the entry panel and update the y coordinate
-            self.entry_panels.append(entry_panel)
+            # Save the row references and update the y coordinate
+            self._leaderboard_rows.append({
+                "medal": medal, "medal_rank": rank,
+                "rank": rank_label, "name": name_label,
+                "score": score_label, "lifetime": lifetime_label,
+                "stretch": stretch_label
+            })
             entry_y += hlbitem - 5
 
     def _initialize_gameover_elements(self):
@@ -374,16 +423,17 @@ class Interface:
             starting_height=5, manager=self.manager, object_id="#game_panel"
         )
         self.game_panel.hide()
-        # Create the score label
+        # Create the score counter
         score_pos_x = self.game_panel.rect.center[0] - (score_width / 2) - 10
-        self._score_lbl = pygame_gui.elements.UILabel(
+        self._score_lbl = HudCounter(
             relative_rect=pygame.Rect(score_pos_x, 0, score_width, 35),
-            text="SCORE: 0", container=self.game_panel, object_id="#score_lbl"
+            text_format="SCORE: {}", container=self.game_panel,
+            object_id="#score_lbl", align="center"
         )
-        # Create the lifetime label
-        self._lifetime_lbl = pygame_gui.elements.UILabel(
+        # Create the lifetime counter
+        self._lifetime_lbl = HudCounter(
             relative_rect=pygame.Rect(45, 0, lifetime_width, 35),
-            text="LIFETIME: 100", container=self.game_panel,
+            text_format="LIFETIME: {:.1f}", container=self.game_panel,
             object_id="#lifetime_lbl"
         )
         # Create the life icon
@@ -393,11 +443,11 @@ class Interface:
             image_surface=self.heart_icon,
             container=self.game_panel
         )
-        # Create the stretch label (length of the snake)
+        # Create the stretch counter (length of the snake)
         stretch_pos_x = self.game_panel.rect.width - stretch_width
-        self._stretch_lbl = pygame_gui.elements.UILabel(
+        self._stretch_lbl = HudCounter(
             relative_rect=pygame.Rect(stretch_pos_x, 0, stretch_width, 35),
-            text="STRETCH: 0m", container=self.game_panel,
+            text_format="STRETCH: {}m", container=self.game_panel,
             object_id="#stretch_lbl"
         )
         # Create the stretch icon
@@ -406,45 +456,133 @@ class Interface:
             image_surface=self.icons.subsurface((65, 0, 55, 55)),
             container=self.game_panel
         )
+        # Draw the starting values of the counters
+        self.update_score(0)
+        self.update_lifetime(100)
+        self.update_stretch(0)
 
     def update(self):
         """ Updates manually some of the animations for GUI elements. """
+        self.animate_game_panel()
+        # Update the floaters if it exists regardless of the state
+        self._floaters.update()
+
+    @gui_call
+    def animate_game_panel(self):
+        """ Moves the game panel one step into or out of the screen. """
         match self.state:
             case GAMESTATE.PLAY:
                 # Animate the gamepanel to go down when the game starts
                 if self.game_panel.rect.y < -5:
                     pos = pygame.Vector2(self.game_panel.rect.topleft)
                     self.game_panel.set_position(pos + pygame.Vector2(0, 1))
+                    self._gui_version += 1
 
             case GAMESTATE.GAMEOVER:
                 # Animate the gamepanel to go up when the game ends
                 if self.game_panel.rect.y > -55:
                     pos = pygame.Vector2(self.game_panel.rect.topleft)
                     self.game_panel.set_position(pos - pygame.Vector2(0, 1))
+                    self._gui_version += 1
 
-        # Update the floaters if it exists regardless of the state
-        for floater in self._floaters:
-            floater.update()
-
-    def draw(self):
+    def defer_gui_calls(self):
+        """
+        Makes the calling thread the only one that changes the GUI. The
+        GUI calls of the other threads are queued until the next update.
+        """
+        self._gui_thread = threading.get_ident()
+
+    def run_gui_calls(self):
+        """ Runs the queued GUI calls of the other threads in order. """
+        while True:
+            try:
+                method, args, kwargs = self._gui_calls.get_nowait()
+            except queue.Empty:
+                return
+            method(self, *args, **kwargs)
+
+    @probe
+    def update_gui(self, time_delta):
+        """ Updates the GUI Manager elements of the attached panels. """
+        self.run_gui_calls()
+        self.manager.update(time_delta)
+
+    @probe
+    def draw_gui(self, surface):
+        """
+        Draws the GUI Manager elements. On PLAY state the GUI is drawn
+        into a cached surface that is only redrawn when the interface has
+        changed an image (the GUI version) or a visible element has moved.
+        """
+        if not Config.GUI_CACHE or self.state != GAMESTATE.PLAY:
+            self._gui_signature = None
+            self.manager.draw_ui(surface)
+            return
+        visible = self.manager.get_sprite_group().visible
+        signature = (self._gui_version,
+                     [tuple(rect) for image, rect, *_ in visible])
+        if signature != self._gui_signature:
+            self._gui_signature = signature
+            self._gui_surface.fill((0, 0, 0, 0), self._gui_area)
+            self.manager.draw_ui(self._gui_surface)
+            # Only the area covered by the elements is blitted each frame
+            # Containers have empty images and are not part of the area
+            rects = [rect for image, rect, *_ in visible
+                     if image.get_width() and image.get_height()]
+            area = pygame.Rect(0, 0, 0, 0)
+            if rects:
+                area = rects[0].unionall(rects)
+            self._gui_area = area.clip(self._gui_surface.get_rect())
+        surface.blit(self._gui_surface, self._gui_area, self._gui_area,
+                     special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def _panel_sprites(self, element):
+        """ Returns the element and all of its children GUI elements. """
+        sprites = [element]
+        if isinstance(element, IContainerLikeInterface):
+            container = element.get_container()
+            if container is not element:
+                sprites.append(container)
+            for child in container.elements:
+                sprites.extend(self._panel_sprites(child))
+        return sprites
+
+    def _attach_state_panels(self):
+        """
+        Removes the panels that are not used by the current state from the
+        GUI Manager sprite group so they are not updated or drawn at all.
+        The panels of the current state are added back to the group.
+        """
+        group = self.manager.get_sprite_group()
+        panels = self._state_panels[self.state]
+        for panel in {p for ps in self._state_panels.values() for p in ps}:
+            if panel in panels and panel in self._detached:
+                for sprite in self._detached.pop(panel):
+                    sprite.add(group)
+            elif panel not in panels and panel not in self._detached:
+                sprites = self._panel_sprites(panel)
+                for sprite in sprites:
+                    sprite.remove(group)
+                self._detached[panel] = sprites
+
+    @probe
+    def draw(self, surface=None):
         """ Draws some GUI elements that are not included in the Manager. """
+        if surface is None:
+            surface = self.screen
         match self.state:
             case GAMESTATE.PLAY:
-                for floater in self._floaters:
-                    floater.draw(self.screen)
+                self._floaters.draw(surface)
 
     def process_events(self, event):
         """ Checks for events related to pygame_gui elements."""
-        # TEXT EFFECT FINISHED EVENT
-        if event.type == pygame_gui.UI_TEXT_EFFECT_FINISHED:
-            if event.ui_element.get_object_id() == "@regen_lbl":
-                # Find the label element in the floater to destroy
-                for floater in self._floaters:
-                    if event.ui_element == floater.label:
-                        floater.destroy()
-                        self._floaters.remove(floater)
-                        break
+        # SCROLL LEADERBOARD EVENT
+        if event.type == pygame.MOUSEWHEEL and self.state == GAMESTATE.MENU:
+            mouse_pos = pygame.mouse.get_pos()
+            if self.leaderboard_panel.rect.collidepoint(mouse_pos):
+                self.scroll_leaderboard(-event.y)
 
+    @gui_call
     def main_menu_event(self):
         """ Sets the gamestate and shows the menu panel. """
         self.state = GAMESTATE.MENU
@@ -457,13 +595,17 @@ class Interface:
         # Reset the saved player names
         self._saved_name = None
         self._results_player_name.set_text("")
+        self._attach_state_panels()
 
+    @gui_call
     def start_game_event(self):
         """ Sets the gamestate and hides the menu panel. """
         self.state = GAMESTATE.PLAY
         self.menu_panel.hide()
         self.game_panel.show()
+        self._attach_state_panels()
 
+    @gui_call
     def restart_game_event(self):
         """ Restarts a new game and resets the game panel labels. """
         self.state = GAMESTATE.PLAY
@@ -474,7 +616,9 @@ class Interface:
         self.update_stretch(0)
         # Save the player name
         self._saved_name = self._results_player_name.get_text() or "PLAYER"
+        self._attach_state_panels()
 
+    @gui_call
     def gameover_event(self):
         """ Sets the gamestate and shows the gameover panel. """
         self.state = GAMESTATE.GAMEOVER
@@ -482,60 +626,72 @@ class Interface:
         # If there is a saved player name then replace it to the textbox
         if self._saved_name:
             self._results_player_name.set_text(self._saved_name)
+        self._attach_state_panels()
 
+    @probe
     def spawn_regen_label(self, position, regen, points):
         """ Spawns a label that shows the regen stat after eating food. """
-        floater = Floater(name="regen", position=position - (35, 0),
-                          dimension=(35, 30), text=f"+{regen}",
-                          icon=self.heart_icon, isize=25)
-        point_floater = Floater(name="points", position=position + (30, 0),
-                                dimension=(40, 30), text=f"{points}",
-                                icon=self.score_icon, isize=25)
-        self._floaters.append(floater)
-        self._floaters.append(point_floater)
-
+        self._floaters.spawn(name="regen", position=position - (35, 0),
+                             dimension=(35, 30), text=f"+{regen}",
+                             icon=self.heart_icon, isize=25)
+        self._floaters.spawn(name="points", position=position + (30, 0),
+                             dimension=(40, 30), text=f"{points}",
+                             icon=self.score_icon, isize=25)
+
+    @probe
     def spawn_buff_label(self, buff_icon, position, buff_value, points, negate):
         """ Spawns a floating label that shows buff acquired and points. """
-        buff_icon.set_alpha(255)
         vlabel = "-" if negate else "+"
-        buff_float = Floater(name="buff", position=position - (35, 0),
+        self._floaters.spawn(name="buff", position=position - (35, 0),
                              dimension=(35, 30), text=f"{vlabel}{buff_value}",
                              icon=buff_icon, isize=30)
-        point_floater = Floater(name="points", position=position + (30, 0),
-                                dimension=(40, 30), text=f"{points}",
-                                icon=self.score_icon, isize=25)
-        self._floaters.append(buff_float)
-        self._floaters.append(point_floater)
+        self._floaters.spawn(name="points", position=position + (30, 0),
+                             dimension=(40, 30), text=f"{points}",
+                             icon=self.score_icon, isize=25)
 
+    @probe
     def spawn_bomb_label(self, position, damage, deduction):
         """ Spawns a floating label that shows bomb damage and reductions. """
-        floater = Floater(name="damage", position=position - (37, 0),
-                          dimension=(50, 30), text=f"-{damage}",
-                          icon=self.heart_icon, isize=25)
-        point_floater = Floater(name="deduction", position=position + (40, 0),
-                                dimension=(45, 30), text=f"{deduction}",
-                                icon=self.score_icon, isize=25)
-        self._floaters.append(floater)
-        self._floaters.append(point_floater)
+        self._floaters.spawn(name="damage", position=position - (37, 0),
+                             dimension=(50, 30), text=f"-{damage}",
+                             icon=self.heart_icon, isize=25)
+        self._floaters.spawn(name="deduction", position=position + (40, 0),
+                             dimension=(45, 30), text=f"{deduction}",
+                             icon=self.score_icon, isize=25)
+
+    @property
+    def floater_count(self):
+        """ Returns the number of floaters that are animating. """
+        return len(self._floaters)
 
     def destroy_floaters(self):
         """ Removes all existing floaters in the draw pipeline. """
-        for floater in self._floaters:
-            floater.destroy()
-        self._floaters = []
+        self._floaters.clear()
+
+    @gui_call
+    def hide_game_panel(self):
+        """ Hides the game panel at once (the snake bumped the top). """
+        self.game_panel.hide()
 
+    @gui_call
     def update_score(self, score):
-        """ Updates the score label with current score of the game. """
-        self._score_lbl.set_text(f"SCORE: {score}")
+        """ Updates the score counter with current score of the game. """
+        if self._score_lbl.set_value(score):
+            self._gui_version += 1
 
+    @gui_call
     def update_lifetime(self, lifetime):
-        """ Updates the lifetime label with current lifetime of the game. """
-        self._lifetime_lbl.set_text(f"LIFETIME: {lifetime:.1f}")
+        """ Updates the lifetime counter with current lifetime of the game. """
+        if self._lifetime_lbl.set_value(lifetime):
+            self._gui_version += 1
 
+    @gui_call
     def update_stretch(self, stretch):
-        """ Updates the stretch label with current length of the snake. """
-        self._stretch_lbl.set_text(f"STRETCH: {stretch}m")
+        """ Updates the stretch counter with current length of the snake. """
+        if self._stretch_lbl.set_value(stretch):
+            self._gui_version += 1
 
+    @gui_call
     def update_results_data(self, *, score="0",
                             stretch="0", lifetime="0"):
         """ Updates the results panel with the final game data. """
@@ -547,17 +703,71 @@ class Interface:
         """ Gets the player name in the gameover player textbox. """
         return self._results_player_name.get_text() or "PLAYER"
 
-    def update_leaderboard_data(self, data):
-        """ This will remove the current LB UI and recreate it from data. """
-        # Clear each panel first
-        for panel in self.entry_panels:
-            panel.kill()
-        # Reinitialize the Leaderboard UI
-        data = data if data else [None, None, None]
-        self._initialize_leaderboard_items(data)
-
+    @gui_call
+    def update_leaderboard_data(self, leaderboard, offset=None):
+        """
+        Fills the leaderboard rows with the top scores queried from the
+        leaderboard database starting at the given rank offset.
+        """
+        self._leaderboard = leaderboard
+        if offset is not None:
+            self._leaderboard_offset = offset
+        rows, offset = Config.LEADERBOARD_ROWS, self._leaderboard_offset
+        data = leaderboard.top(limit=rows, offset=offset)
+        # Fill the missing ranks with None to show the empty rows
+        data = data + [None] * (rows - len(data))
+        for rank, (row, player) in enumerate(zip(self._leaderboard_rows,
+                                                 data), start=offset + 1):
+            self._update_leaderboard_row(row, rank, player)
+
+    def scroll_leaderboard(self, steps):
+        """
+        Scrolls the leaderboard rows by the given number of ranks. Only
+        the top LEADERBOARD_MAX_RANK scores can be scrolled into view.
+        """
+        if not self._leaderboard:
+            return
+        rows = Config.LEADERBOARD_ROWS
+        max_offset = max(0, Config.LEADERBOARD_MAX_RANK - rows)
+        offset = min(max(0, self._leaderboard_offset + steps), max_offset)
+        # Don't scroll past the last saved score
+        while (offset > self._leaderboard_offset and
+               len(self._leaderboard.top(limit=rows, offset=offset)) < rows):
+            offset -= 1
+        if offset != self._leaderboard_offset:
+            self.update_leaderboard_data(self._leaderboard, offset)
+
+    def _update_leaderboard_row(self, row, rank, player):
+        """ Updates the labels of a leaderboard row with the player data. """
+        # Only the top 3 ranks will show a medal icon
+        if rank <= 3:
+            if row["medal_rank"] != rank:
+                row["medal"].set_image(self._medals[rank - 1])
+                row["medal_rank"] = rank
+            if not row["medal"].visible:
+                row["medal"].show()
+        elif row["medal"].visible:
+            row["medal"].hide()
+        self._set_label_text(row["rank"], f"{rank}")
+        self._set_label_text(row["name"],
+                             player["name"] if player else "-----")
+        self._set_label_text(row["score"],
+                             f"{player['score']}" if player else "-----")
+        self._set_label_text(row["lifetime"],
+                             f"{player['lifetime']}s" if player else "-----")
+        self._set_label_text(row["stretch"],
+                             f"{player['stretch']}m" if player else "-----")
+
+    @staticmethod
+    def _set_label_text(label, text):
+        """ Sets the text of a label only if its value has changed. """
+        if label.text != text:
+            label.set_text(text)
+
+    @gui_call
     def update_moments_image(self, image, life_left):
         """ Updates the last moments image with the given image. """
         self.moments_image.set_image(image)
         self.moments_image.rebuild()
-        self.life_left.set_text(f"HEALTH: {life_left}")
+        self._gui_version += 1
+        self._set_label_text(self.life_left, f"HEALTH: {life_left}")
@@ -0,0 +1,70 @@
+"""
+Interpolation Class - interpolation.py
+-----------------------------------------------------------
+This module contains the Interpolation Class that lets the
+game be drawn at a different rate than it is updated. The
+game is updated with a fixed tick and each frame is drawn
+between the last two ticks, so a fast display shows a
+smooth snake without updating the game faster, and a slow
+computer draws fewer frames while the game keeps its speed.
+The moving objects save their position before each tick
+and ask for the position to draw between the two ticks.
+When it is disabled the current position is always drawn.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+from src.config import Config
+
+
+class Interpolation:
+
+    # Fixed time of each tick and the most time that can be caught up
+    TICK = 1 / Config.SIM_TICK_RATE
+    MAX_LAG = Config.SIM_MAX_LAG
+    # Moves longer than this are jumps (teleports) and are not blended
+    MAX_JUMP = Config.SNAKE_SIZE
+
+    # Interpolation state shared by the whole game
+    enabled = False
+    tick = 0
+    alpha = 1.0
+    _accumulator = 0.0
+
+    @classmethod
+    def advance(cls, update, time_delta):
+        """
+        Calls the update function with the fixed tick for each tick
+        that passed in the time delta (in seconds), then saves how far
+        the time is between the last tick and the next one.
+        """
+        cls._accumulator = min(cls._accumulator + time_delta, cls.MAX_LAG)
+        while cls._accumulator >= cls.TICK:
+            update(cls.TICK)
+            cls._accumulator -= cls.TICK
+        cls.alpha = cls._accumulator / cls.TICK
+
+    @classmethod
+    def previous(cls, rect):
+        """
+        Returns the saved position of the rect before the current tick.
+        The objects call this at the start of their update.
+        """
+        if rect is None:
+            return None
+        return cls.tick, rect.x, rect.y
+
+    @classmethod
+    def position(cls, previous, rect):
+        """
+        Returns the position to draw the rect at. If the object was
+        moved in the last tick, this is the position between the
+        previous and the current position. Otherwise it is the rect.
+        """
+        if not cls.enabled or not previous or previous[0] != cls.tick:
+            return rect
+        _, x, y = previous
+        move_x, move_y = rect.x - x, rect.y - y
+        if abs(move_x) > cls.MAX_JUMP or abs(move_y) > cls.MAX_JUMP:
+            return rect
+        return x + move_x * cls.alpha, y + move_y * cls.alpha
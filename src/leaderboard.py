@@ -0,0 +1,304 @@
+"""
+Leaderboard Class - leaderboard.py
+-----------------------------------------------------------
+This module contains the Leaderboard Class that stores the
+results of every finished game in an SQLite database file.
+The table is indexed by score, player name and lifetime so
+the menu can query the top entries, the best game of each
+player, the rank of a score and the paged history without
+loading every saved game into memory.
+New entries are written by a background thread so saving
+never blocks the game loop. The highest scores are kept in
+memory so the menu can be refreshed right away.
+Several game instances can share the same database file,
+SQLite locks the file on each write and every instance can
+cheaply pick up only the entries added by the others.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import bisect
+import logging
+import marshal
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from src.tracer import probe
+
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+
+    # Columns returned for every leaderboard entry
+    FIELDS = ("name", "score", "stretch", "lifetime")
+    # Number of top entries kept in memory and max pending writes
+    CACHE_SIZE = 50
+    QUEUE_SIZE = 64
+    # Seconds to wait for the file lock held by another game instance
+    LOCK_TIMEOUT = 10
+
+    INSERT = ("INSERT INTO entries (name, score, stretch, lifetime, "
+              "played_at) VALUES (?, ?, ?, ?, ?)")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            stretch INTEGER NOT NULL,
+            lifetime INTEGER NOT NULL,
+            played_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_score
+            ON entries (score DESC, id);
+        CREATE INDEX IF NOT EXISTS idx_entries_name_score
+            ON entries (name, score DESC);
+        CREATE INDEX IF NOT EXISTS idx_entries_lifetime
+            ON entries (lifetime DESC);
+    """
+
+    def __init__(self, path, *, legacy_path=None):
+        """
+        Opens (or creates) the leaderboard database in the given path.
+        If the database is still empty and the old marshal leaderboard
+        file exists, its entries are imported once into the new table.
+        This also loads the top entries in memory and starts the
+        background writer thread for the new entries.
+        """
+        self.path = Path(path)
+        # The threaded mode refreshes from the simulation thread while the
+        # main thread reads, so the connection and the cache are locked
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, timeout=self.LOCK_TIMEOUT,
+                                     check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets the writer thread commit while the menu is reading
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        # Bounded queue of the entries waiting for the writer thread
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        if legacy_path and Path(legacy_path).exists():
+            self._import_legacy(Path(legacy_path))
+        # Load the in-memory view of the highest scores
+        self._top_cache = self._select(
+            "SELECT * FROM entries ORDER BY score DESC, id LIMIT ?",
+            (self.CACHE_SIZE,)
+        )
+        # Track the last seen row and the rows written by this instance
+        # to refresh only the entries saved by the other instances
+        self._last_id = self._conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM entries").fetchone()[0]
+        self._own_ids = set()
+        self._data_version = self._get_data_version()
+        self._closed = False
+        # Start the writer thread that commits the queued entries
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name="leaderboard-writer", daemon=True)
+        self._writer.start()
+
+    def _import_legacy(self, legacy_path):
+        """
+        Imports the entries of the old marshal leaderboard.bin file.
+        The write lock is taken before checking if the table is empty,
+        so only the first game instance that starts will import it.
+        """
+        if self._conn.execute("SELECT 1 FROM entries").fetchone():
+            return
+        entries = marshal.loads(legacy_path.read_bytes())
+        self._conn.execute("BEGIN IMMEDIATE")
+        with self._conn:
+            if not self._conn.execute("SELECT 1 FROM entries").fetchone():
+                self._conn.executemany(
+                    self.INSERT, [(e["name"], e["score"], e["stretch"],
+                                   e["lifetime"], time.time())
+                                  for e in entries]
+                )
+
+    def _get_data_version(self):
+        """ Returns the counter that changes on commits of other instances. """
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _write_loop(self):
+        """
+        Runs in the writer thread with its own database connection.
+        Every pending entry in the queue is committed in one transaction,
+        so a game is either fully saved or not saved at all. A failed
+        commit is logged and the thread keeps running, so flush never
+        waits for a batch that will not be marked as done.
+        """
+        conn = sqlite3.connect(self.path, timeout=self.LOCK_TIMEOUT)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Drain the other entries that are already waiting
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # A None entry is the signal to stop the writer thread
+            running = None not in batch
+            rows = [row for row in batch if row is not None]
+            try:
+                if rows:
+                    self._commit(conn, rows)
+            except Exception:
+                logger.exception("Could not save %d leaderboard entries",
+                                 len(rows))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    @probe
+    def _commit(self, conn, rows):
+        """ Inserts the rows of the writer thread in one transaction. """
+        with conn:
+            for row in rows:
+                rowid = conn.execute(self.INSERT, row).lastrowid
+                self._own_ids.add(rowid)
+
+    def _select(self, query, params=()):
+        """ Runs a select query and converts the rows into dictionaries. """
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{field: row[field] for field in self.FIELDS} for row in rows]
+
+    @probe
+    def add(self, *, name, score, stretch, lifetime):
+        """
+        Saves the result of a finished game. The in-memory top entries
+        are updated right away and the database write is queued to the
+        writer thread. If the writer is so far behind that the queue is
+        full, the entry is only kept in memory and the drop is logged.
+        """
+        self._insert_cached({"name": name, "score": score,
+                             "stretch": stretch, "lifetime": lifetime})
+        try:
+            self._queue.put_nowait((name, score, stretch, lifetime,
+                                    time.time()))
+        except queue.Full:
+            logger.error("The leaderboard writer is behind, the game of %s "
+                         "with %d points is not saved", name, score)
+
+    def _insert_cached(self, entry):
+        """ Inserts an entry in the in-memory top scores if it belongs. """
+        # Insert after the entries with the same score (older games first)
+        with self._lock:
+            index = bisect.bisect_right(self._top_cache, -entry["score"],
+                                        key=lambda e: -e["score"])
+            if index < self.CACHE_SIZE:
+                self._top_cache.insert(index, entry)
+                del self._top_cache[self.CACHE_SIZE:]
+
+    def refresh(self):
+        """
+        Loads the entries committed by the other game instances since the
+        last refresh. This returns True if the in-memory view changed.
+        Only the new rows are read, using the primary key of the table.
+        """
+        with self._lock:
+            data_version = self._get_data_version()
+            if data_version == self._data_version:
+                return False
+            self._data_version = data_version
+            rows = self._conn.execute(
+                "SELECT * FROM entries WHERE id > ? ORDER BY id",
+                (self._last_id,)
+            ).fetchall()
+        changed = False
+        for row in rows:
+            self._last_id = row["id"]
+            # Skip the rows written by the writer thread of this instance
+            if row["id"] in self._own_ids:
+                self._own_ids.discard(row["id"])
+                continue
+            self._insert_cached({field: row[field] for field in self.FIELDS})
+            changed = True
+        return changed
+
+    def flush(self):
+        """ Blocks until every queued entry is committed to the database. """
+        self._queue.join()
+
+    def top(self, limit=3, offset=0):
+        """ Returns a page of the highest scores in descending order. """
+        if offset + limit <= self.CACHE_SIZE:
+            with self._lock:
+                cached = self._top_cache[offset:offset + limit]
+            return [dict(e) for e in cached]
+        self.flush()
+        return self._select(
+            "SELECT * FROM entries ORDER BY score DESC, id "
+            "LIMIT ? OFFSET ?", (limit, offset)
+        )
+
+    def best_per_player(self, limit=3, offset=0):
+        """ Returns a page of the single best game of each player. """
+        self.flush()
+        return self._select(
+            "SELECT name, MAX(score) AS score, stretch, lifetime "
+            "FROM entries GROUP BY name ORDER BY score DESC, name "
+            "LIMIT ? OFFSET ?", (limit, offset)
+        )
+
+    def player_history(self, name, limit=10, offset=0):
+        """ Returns a page of the games of a player, newest first. """
+        self.flush()
+        return self._select(
+            "SELECT * FROM entries WHERE name = ? ORDER BY id DESC "
+            "LIMIT ? OFFSET ?", (name, limit, offset)
+        )
+
+    def history(self, limit=10, offset=0):
+        """ Returns a page of all the saved games, newest first. """
+        self.flush()
+        return self._select(
+            "SELECT * FROM entries ORDER BY id DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        )
+
+    def longest_lifetimes(self, limit=3, offset=0):
+        """ Returns a page of the games that survived the longest. """
+        self.flush()
+        return self._select(
+            "SELECT * FROM entries ORDER BY lifetime DESC, id "
+            "LIMIT ? OFFSET ?", (limit, offset)
+        )
+
+    def rank(self, score):
+        """ Returns the leaderboard position that the score would have. """
+        self.flush()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE score > ?", (score,)
+            ).fetchone()
+        return row[0] + 1
+
+    def count(self):
+        """ Returns the total number of saved games. """
+        self.flush()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        """
+        Commits the pending entries and closes the database file. The
+        writer is given up on if it can not take the stop signal in time.
+        Closing again does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=self.LOCK_TIMEOUT)
+            self._writer.join()
+        except queue.Full:
+            logger.error("The leaderboard writer is stuck, the pending "
+                         "entries are not saved")
+        self._conn.close()
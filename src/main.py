@@ -8,10 +8,20 @@ Author: Fidel Jesus O. Surtida I
 Project Start: March 27, 2024
 -------------------------------------
 """
+import argparse
+import contextlib
 import pygame
 import pygame_gui
+from src.capture import FrameCapture
 from src.config import Config
 from src.game import Game
+from src.governor import QualityGovernor
+from src.interpolation import Interpolation
+from src.profiler import FrameProfiler
+from src.renderer import TextureCanvas
+from src.simulation import Simulation
+from src.tracer import Tracer
+from src.watchdog import FrameWatchdog
 
 
 # Initialize Pygame
@@ -23,37 +33,215 @@ manager = pygame_gui.UIManager(Config.SCREEN_DIMENSIONS, Config.theme_path())
 pygame.display.set_caption("Snake Game")
 
 
-def main():
+def parse_args(argv=None):
+    """ Parses the command line options of the game. """
+    parser = argparse.ArgumentParser(description="A simple snake game.")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="save a Chrome trace JSON file of the session")
+    parser.add_argument("--hitch-budget", metavar="MS", type=float,
+                        help="log the stacks of the frames over MS ms to "
+                             "data/logs/hitches.log (default budget "
+                             f"{Config.WATCHDOG_BUDGET} if the watchdog "
+                             "is enabled in the config)")
+    parser.add_argument("--stress", action="store_true",
+                        help="play with the counts of the stress profile")
+    parser.add_argument("--fps", type=int, default=Config.FPS,
+                        help="frames drawn per second (0 is uncapped), the "
+                             "game is still updated at the tick rate")
+    parser.add_argument("--vsync", action="store_true",
+                        help="draw a frame on every display refresh")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="let the autopilot play the game")
+    parser.add_argument("--threaded", action="store_true",
+                        default=Config.SIM_THREADED,
+                        help="update the game in a thread at a fixed tick")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record the frames as a raw video if PATH "
+                             "ends .raw, else in the PATH directory to be "
+                             "converted to PNG images")
+    parser.add_argument("--renderer", default=Config.RENDERER,
+                        choices=["surface", "gpu"],
+                        help="draw with surface blits or with the textures "
+                             "of the SDL2 Renderer (software without a GPU)")
+    args = parser.parse_args(argv)
+    if args.hitch_budget is not None and args.hitch_budget <= 0:
+        parser.error("--hitch-budget must be greater than 0")
+    return args
 
+
+def set_vsync_mode():
+    """
+    Creates the screen again synced with the display refresh rate.
+    Returns False if the display does not support vsync.
+    """
+    global screen
+    try:
+        screen = pygame.display.set_mode(Config.SCREEN_DIMENSIONS,
+                                         pygame.SCALED, vsync=1)
+    except pygame.error:
+        return False
+    return True
+
+
+def create_canvas(vsync):
+    """
+    Hides the screen and creates the window of the TextureCanvas. The
+    hidden screen is still used for the pixel format of the images.
+    """
+    global screen
+    screen = pygame.display.set_mode(Config.SCREEN_DIMENSIONS, pygame.HIDDEN)
+    canvas = TextureCanvas("Snake Game", Config.SCREEN_DIMENSIONS,
+                           vsync=vsync)
+    if not canvas.accelerated:
+        print("No GPU renderer is available, using the software renderer")
+    return canvas
+
+
+def main(argv=None):
+
+    # Record the probed functions if a trace file is requested
+    args = parse_args(argv)
+    if args.trace:
+        Tracer.install(args.trace)
+    # Replace the object counts and arena size with the stress profile
+    if args.stress:
+        Config.apply_profile(Config.STRESS_PROFILE)
+    # Sync the frames with the display, the flip waits for the refresh
+    render_fps = args.fps
+    canvas = None
+    if args.renderer == "gpu":
+        canvas = create_canvas(args.vsync)
+        if args.vsync:
+            render_fps = 0
+    elif args.vsync and set_vsync_mode():
+        render_fps = 0
+    # The game draws on the canvas instead of the screen with the GPU
+    target = canvas or screen
+    # Draw between the ticks if the frames are not drawn at the tick rate
+    Interpolation.enabled = (args.threaded or args.vsync or
+                             render_fps != Config.SIM_TICK_RATE)
     # Create instance of the Game class and include also the GUI manager
-    game = Game(screen, manager)
+    game = Game(target, manager)
+    game.autopilot_play = args.autopilot
     # Create the game clock object for limiting the FPS
     clock = pygame.time.Clock()
+    # Start the watchdog that logs the stack of the over budget frames
+    # (only if it is enabled in the config or a hitch budget is given)
+    watchdog = None
+    if Config.WATCHDOG_ENABLED or args.hitch_budget is not None:
+        budget = args.hitch_budget
+        if budget is None:
+            budget = Config.WATCHDOG_BUDGET
+        watchdog = FrameWatchdog(Config.data_path("logs/hitches.log"),
+                                 budget=budget, context=game.debug_context)
+    # Update the game in the simulation thread in the threaded mode
+    simulation = None
+    lock = contextlib.nullcontext()
+    if args.threaded:
+        simulation = Simulation(game)
+        lock = simulation.lock
+        simulation.start()
+    # Lower the quality of the effects if the frames are over budget
+    if Config.GOVERNOR_ENABLED:
+        QualityGovernor.enable()
+    # Record the frames in a writer thread if a capture path is given
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture, screen,
+                               fps=render_fps or Config.FPS)
+    # Start the frame profiler overlay if it is enabled in the config
+    if Config.PROFILER_ENABLED:
+        FrameProfiler.toggle()
 
     # Game Loop
     running = True
     while running:
-        # Limit FPS to 60 and get time delta
-        time_delta = clock.tick(60)
+        # Limit the FPS (uncapped with vsync) and get time delta
+        time_delta = clock.tick(render_fps)
+        if watchdog:
+            watchdog.frame_start()
+        QualityGovernor.frame_start()
 
-        # Event handling
-        running = game.game_events()
+        # The simulation thread waits while the events change the game
+        with lock:
+            # Event handling
+            with FrameProfiler.stage("events"):
+                running = game.game_events()
 
-        # Game and GUI Updates
-        game.update(time_delta / 1000)
-        manager.update(time_delta)
+        # Game Updates (the game is updated by the thread in the threaded
+        # mode, so only the frame of its last tick is taken)
+        frame = None
+        if simulation:
+            if not running:
+                simulation.stop()
+            frame = simulation.snapshot()
+        elif Interpolation.enabled:
+            Interpolation.advance(game.update, time_delta / 1000)
+        else:
+            game.update(time_delta / 1000)
+        # GUI Updates (with the GUI changes queued by the ticks)
+        with FrameProfiler.stage("gui update"):
+            game.interface.update_gui(time_delta)
 
-        # Clear the screen
-        screen.fill("black")
+        # Clear the screen and render the Game Objects
+        with game.screen_lock:
+            target.fill("black")
+            with FrameProfiler.stage("draw"):
+                if frame is not None:
+                    frame.replay(target)
+                else:
+                    game.draw()
+            # Record the region around the head for the deathcam loop
+            # (the head was taken with the frame in the threaded mode)
+            if frame is not None:
+                game.deathcam_update(frame.deathcam)
+            else:
+                game.deathcam_update(game.deathcam_target())
 
-        # Render the Game Objects and the GUI
-        game.draw()
-        manager.draw_ui(screen)
+        # Render the GUI (on the overlay texture of the canvas)
+        if canvas:
+            with FrameProfiler.stage("gui draw"):
+                canvas.draw_overlay(game.interface.draw_gui,
+                                    FrameProfiler.draw)
+        else:
+            with FrameProfiler.stage("gui draw"):
+                game.interface.draw_gui(screen)
+            FrameProfiler.draw(screen)
+        # Copy the frame for the capture writer (dropped if it is behind)
+        if capture:
+            with game.screen_lock:
+                if canvas:
+                    capture.capture(canvas.subsurface(canvas.get_rect()))
+                else:
+                    capture.capture(screen)
+        # The flip is not timed since it waits for the display in vsync
+        QualityGovernor.frame_end()
+        if watchdog:
+            watchdog.frame_end()
 
         # Update the screen
-        pygame.display.flip()
+        with FrameProfiler.stage("flip"):
+            if canvas:
+                canvas.present()
+            else:
+                pygame.display.flip()
+        FrameProfiler.end_frame()
 
-    # Quit Pygame after the game loop ends
+    # Save the trace file and quit Pygame after the game loop ends
+    if simulation:
+        simulation.close()
+    # Commit the pending leaderboard entries once the game is not updated
+    game.leaderboard.close()
+    if capture:
+        capture.close()
+        print(f"Captured {capture.written} frames to {capture.path} "
+              f"({capture.dropped} dropped)")
+        if capture.directory:
+            print(f"Convert them to PNG images with: "
+                  f"python -m src.capture {capture.path}")
+    Tracer.save()
+    if watchdog:
+        watchdog.close()
     pygame.quit()
 
 
@@ -14,8 +14,14 @@ import pygame
 import random
 from pygame.sprite import Sprite
 from src.config import Config
+from src.governor import QualityGovernor
+from src.interpolation import Interpolation
+from src.renderer import draw_sprite
+from src.tracer import probe
 
 
+@Config.bind(LIFETIME="BOMB_LIFETIME", SPAWN_DELAY_MIN="BOMB_MIN_SPAWN_DELAY",
+             SPAWN_DELAY_MAX="BOMB_MAX_SPAWN_DELAY")
 class Bomb(Sprite):
 
     # Bomb Settings from Config
@@ -24,6 +30,7 @@ class Bomb(Sprite):
     EXPLOSION_SIZE = Config.EXPLOSION_SIZE
     LIFETIME = Config.BOMB_LIFETIME
     SCALE_TIME = 0.5
+    NO_BOUNDS = pygame.Rect(0, 0, 0, 0)
     SPAWN_DELAY_MIN = Config.BOMB_MIN_SPAWN_DELAY
     SPAWN_DELAY_MAX = Config.BOMB_MAX_SPAWN_DELAY
     EXPLOSION_SHEET = pygame.image.load(Config.assets_path("explosion.png"))
@@ -38,8 +45,9 @@ class Bomb(Sprite):
         snake to prevent spawns near the snake body.
         """
         super().__init__()
+        self.rect = None
+        self._previous = None
         self._img = self.BOMB_IMAGE
-        self.image = pygame.transform.scale(self._img, (0, 0))
         self.spawned = False
         self.exploding = False
         self.damage = damage
@@ -47,8 +55,8 @@ class Bomb(Sprite):
         self._snake = snake
         self._spawn_delay = self._generate_spawn_delay()
         self._lifetime = self.LIFETIME
-        self._swidth = Config.SCREEN_WIDTH
-        self._sheight = Config.SCREEN_HEIGHT
+        self._swidth = Config.ARENA_WIDTH
+        self._sheight = Config.ARENA_HEIGHT
         # Load the spark animation
         self._spark_index = 0
         self._spark_frame = 0
@@ -81,18 +89,20 @@ class Bomb(Sprite):
                                                        self.EXPLOSION_SIZE))
             self._explosion_imgs.append(exp_img)
 
+    @probe
     def _spawn_bomb(self):
         """
         Spawns the bomb object in a random position based on screen
         dimensions and the passed snake object as off limits.
         """
         # Loop until a valid position is generated
+        snake_rects = self._snake.rects
         while True:
             x = random.randint(self.SIZE, self._swidth - self.SIZE * 2)
             y = random.randint(self.SIZE + 50, self._sheight - self.SIZE * 2)
             rect = pygame.Rect(x + self.SIZE // 2, y + self.SIZE // 2, 0, 0)
             collide_rect = pygame.Rect(x, y, self.SIZE, self.SIZE)
-            for part_rect in self._snake.rects:
+            for part_rect in snake_rects:
                 if part_rect.colliderect(collide_rect):
                     break
             else:
@@ -109,8 +119,12 @@ class Bomb(Sprite):
         self._explosion_index = 0
         self._explosion_frame = 0
 
+    @probe
     def update(self, time_delta):
         """ Updates the attributes of the bomb object. """
+        # Save the position before this tick for the interpolation
+        self._previous = Interpolation.previous(self.rect)
+
         # If not spawned then reduce the delay timer
         if not self.spawned:
             self._spawn_delay = max(0, self._spawn_delay - time_delta)
@@ -129,7 +143,6 @@ class Bomb(Sprite):
             if self._lifetime >= self.LIFETIME - self.SCALE_TIME:
                 self._spark_show = False
                 scale = self.SIZE * ((self.LIFETIME - self._lifetime) * 2)
-                self.image = pygame.transform.scale(self._img, (scale, scale))
                 self.rect = pygame.Rect(self._sposition.x - scale // 2,
                                         self._sposition.y - scale // 2,
                                         scale, scale)
@@ -140,7 +153,6 @@ class Bomb(Sprite):
                 self._spark_show = False
                 scale = max(0, self.SIZE * (self._lifetime * 2))
                 pos_mod = (self.SIZE - scale) // 2
-                self.image = pygame.transform.scale(self._img, (scale, scale))
                 self.rect = pygame.Rect(self._eposition.x + pos_mod,
                                         self._eposition.y + pos_mod,
                                         scale, scale)
@@ -158,21 +170,24 @@ class Bomb(Sprite):
                 self._spark_frame = 0
 
         # Update the explosion animation if its currently exploding
+        # The quality governor can skip frames to end it sooner
         if self.exploding and self._explosion_index < 10:
             self._explosion_frame += time_delta
             if self._explosion_frame >= 0.06:
-                self._explosion_index += 1
+                self._explosion_index += QualityGovernor.explosion_step
                 self._explosion_frame = 0
 
+    @probe
     def draw(self, screen):
         """ Draw the bomb in the screen if its spawned. """
         if self.spawned:
-            screen.blit(self.image, self.rect)
+            position = Interpolation.position(self._previous, self.rect)
+            draw_sprite(screen, self._img, position, self.rect.size,
+                        fallback=self._scaled_image)
             # Draw the spark image based on animation index and move it
             # near the rope to animate bomb spark
             if self._spark_show:
-                rspark = pygame.Rect(pygame.Vector2(30, -6) + self.rect.topleft,
-                                     (self.SPARK_SIZE, self.SPARK_SIZE))
+                rspark = (position[0] + 30, position[1] - 6)
                 screen.blit(self._spark_imgs[self._spark_index], rspark)
 
         # Draw the explosion if the bomb is destroyed
@@ -184,19 +199,45 @@ class Bomb(Sprite):
             screen.blit(self._explosion_imgs[self._explosion_index],
                         rect_explode)
 
+    def _scaled_image(self):
+        """ Returns the bomb image scaled to the size of the rect. """
+        if self._scaledimg is None:
+            self._scaledimg = pygame.transform.scale(self._img,
+                                                     self.rect.size)
+        return self._scaledimg
+
+    @property
+    def rect(self):
+        """ Returns the Rect of the bomb (None if not spawned). """
+        return self._rect
+
+    @rect.setter
+    def rect(self, rect):
+        """
+        Sets the Rect of the bomb and computes its reduced bounds once.
+        The rect is replaced while scaling, it is never moved in place.
+        """
+        self._rect = rect
+        self._bounds = None
+        # The image scaled to the rect, only made when drawn on a surface
+        self._scaledimg = None
+        if rect is not None:
+            bounds = rect.copy()
+            adjustment = self.SIZE // 4
+            bounds.topleft = (bounds.x + adjustment, bounds.y + adjustment)
+            bounds.size = (bounds.width - adjustment * 2,
+                           bounds.height - adjustment * 2)
+            self._bounds = bounds
+
     @property
     def bounds(self):
-        """ Returns the reduced Rect object of the Food. """
-        # If lifetime left is for scaling down the bomb then return None
+        """ Returns the reduced Rect object of the bomb. """
+        # If lifetime left is for scaling down the bomb then return empty
         if self._lifetime <= self.SCALE_TIME:
-            return pygame.Rect(0, 0, 0, 0)
-
-        # Else return the default reduced bounds
-        rect = self.rect.copy()
-        adjustment = self.SIZE // 4
-        rect.topleft = (rect.x + adjustment, rect.y + adjustment)
-        rect.size = (rect.width - adjustment * 2, rect.height - adjustment * 2)
-        return rect
+            return self.NO_BOUNDS
+
+        # Else return the cached reduced bounds
+        return self._bounds
 
     def destroy(self):
         """ Removes the bomb and let it respawn again. """
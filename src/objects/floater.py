@@ -1,61 +1,127 @@
 """
-Floater Class - floater.py
+Floater Class / FloaterLayer Class - floater.py
 -----------------------------------------------------------
-This module contains the Floater Class that encapsulates
-the UILabel and an Image as an icon that will float up
+This module contains the Floater Class that renders a text
+and an Image as an icon into one surface that will float up
 when spawned and fades out as it goes up.
 This module can be used for displaying attained points on
 food and also other messages for different powerups.
+The texts are composed from the pre-rendered glyph atlas and
+cached with the resized icons so spawning many floaters does
+not create any GUI element.
+The FloaterLayer Class is used to manage all the floaters.
 -----------------------------------------------------------
 Author: Fidel Jesus O. Surtida I
 -----------------------------------------------------------
 """
+import weakref
 import pygame
-import pygame_gui
+from src.governor import QualityGovernor
+from src.objects.glyphs import GlyphAtlas
+from src.tracer import probe
 
 
 class Floater:
 
+    # Animation settings per update (movement in pixels and alpha)
+    RISE_SPEED = 1
+    FADE_SPEED = 3
+
+    # Shared caches of the rendered texts and resized icons
+    _texts = {}
+    _icons = weakref.WeakKeyDictionary()
+
     def __init__(self, *, name, position, dimension, text, icon, isize):
         """
-        Initialize a UILabel from the pygame_ui as text label on the left.
-        The icon image will be resized and placed on the right side.
+        Initialize the floater surface with the text on the left and the
+        resized icon placed on the right side. The text style is taken
+        from the "@{name}_lbl" block of the GUI theme file.
         """
         x, y, (width, height) = position.x, position.y - 30, dimension
         x -= (width + isize) / 3
-        icon_y = y + ((height - isize) / 2) + 2
-        icon = pygame.transform.scale(icon, (isize, isize))
-
-        self._icon = icon
-        self._icon_rect = pygame.Rect(x + width, icon_y, isize, isize)
-        self._label = pygame_gui.elements.UILabel(
-            relative_rect=pygame.Rect(x, y, width, height),
-            text=text, object_id=f"@{name}_lbl"
-        )
-        # Activate the fade text effect for the label to start animation
-        self._label.set_active_effect(pygame_gui.TEXT_EFFECT_FADE_OUT,
-                                      {"time_per_alpha_change": 6})
+        icon_y = ((height - isize) / 2) + 2
+
+        # Compose the cached text and icon into this floater surface
+        text_img = self._render_text(name, text)
+        self._image = pygame.Surface((width + isize,
+                                      max(height, icon_y + isize)),
+                                     pygame.SRCALPHA)
+        self._image.blit(text_img, text_img.get_rect(
+            center=(width / 2, height / 2)))
+        self._image.blit(self._resize_icon(icon, isize), (width, icon_y))
+        self._rect = self._image.get_rect(topleft=(x, y))
+        self._alpha = 255
+
+    @classmethod
+    def _render_text(cls, name, text):
+        """ Returns the cached text surface composed from the glyph atlas. """
+        key = (name, text)
+        if key not in cls._texts:
+            atlas = GlyphAtlas.get(f"@{name}_lbl")
+            cls._texts[key] = atlas.render(text)
+        return cls._texts[key]
+
+    @classmethod
+    def _resize_icon(cls, icon, isize):
+        """ Returns the cached resized icon with full opacity. """
+        sizes = cls._icons.setdefault(icon, {})
+        if isize not in sizes:
+            resized = pygame.transform.scale(icon, (isize, isize))
+            resized.set_alpha(255)
+            sizes[isize] = resized
+        return sizes[isize]
 
     @property
-    def label(self):
-        """ Returns the UILabel object for this floater. """
-        return self._label
+    def alive(self):
+        """ Returns True while the floater is not yet fully faded out. """
+        return self._alpha > 0
 
     def draw(self, screen):
-        """ Draws the icon to the screen. """
-        screen.blit(self._icon, self._icon_rect)
+        """ Draws the text and icon to the screen. """
+        screen.blit(self._image, self._rect)
 
     def update(self):
-        """ Updates the movement of label and icon to float going up. """
-        x, y = self._label.rect.topleft
-        self._label.set_relative_position((x, y - 1))
-        self._icon_rect.move_ip(0, -1)
-        # We also need to update the alpha value of the icon
-        self._icon.set_alpha(self._icon.get_alpha() - 3)
-
-    def destroy(self):
-        """ Releases the label and icon from the memory. """
-        self._label.kill()
-        del self._label
-        del self._icon
-        del self._icon_rect
+        """ Updates the movement and the alpha value to float going up. """
+        self._rect.move_ip(0, -self.RISE_SPEED)
+        self._alpha = max(0, self._alpha - self.FADE_SPEED)
+        self._image.set_alpha(self._alpha)
+
+
+class FloaterLayer:
+
+    def __init__(self):
+        """ Creates the empty list of floaters that are animating. """
+        self._floaters = []
+
+    def __len__(self):
+        """ Returns the number of floaters that are animating. """
+        return len(self._floaters)
+
+    @probe
+    def spawn(self, **kwargs):
+        """
+        Creates a new floater with the given Floater arguments. If the
+        quality governor limits the floaters, the oldest one is removed.
+        """
+        limit = QualityGovernor.floaters
+        if limit is not None and len(self._floaters) >= limit:
+            del self._floaters[:len(self._floaters) - limit + 1]
+        self._floaters.append(Floater(**kwargs))
+
+    @probe
+    def update(self):
+        """ Updates each floater and removes the faded out floaters. """
+        for floater in self._floaters:
+            floater.update()
+        if self._floaters and not self._floaters[0].alive:
+            self._floaters = [f for f in self._floaters if f.alive]
+
+    @probe
+    def draw(self, screen):
+        """ Draws each floater in this layer. """
+        for floater in self._floaters:
+            floater.draw(screen)
+
+    def clear(self):
+        """ Removes all the floaters in this layer. """
+        self._floaters = []
@@ -14,7 +14,9 @@ import pygame
 import random
 from pygame.sprite import Sprite
 from src.config import Config
+from src.tracer import probe
 from src.objects.particles import ParticleSystem
+from src.timers import Timers
 
 
 class Food(Sprite):
@@ -35,14 +37,15 @@ class Food(Sprite):
         random position of the Food.
         """
         super().__init__()
+        self.rect = None
         self.image = pygame.image.load(Config.assets_path(filename))
         self.image = pygame.transform.scale(self.image, (self.SIZE, self.SIZE))
         self.spawned = False
         self.spawn_event = self.SPAWN_FOOD_EVENT
         self.points = points
         self.regen = regen
-        self._swidth = Config.SCREEN_WIDTH
-        self._sheight = Config.SCREEN_HEIGHT
+        self._swidth = Config.ARENA_WIDTH
+        self._sheight = Config.ARENA_HEIGHT
 
         # Create the Particle System for the Food
         assets_path = Config.assets_path("particles.png")
@@ -55,8 +58,9 @@ class Food(Sprite):
 
     def _trigger_spawn(self):
         """ Triggers the timer for the Food to spawn. """
-        pygame.time.set_timer(self.SPAWN_FOOD_EVENT, self.SPAWN_DELAY)
+        Timers.set_timer(self, self.SPAWN_FOOD_EVENT, self.SPAWN_DELAY)
 
+    @probe
     def spawn(self, *, off_limits_rects):
         """
         Sets the Food at a random position based on screen bounds.
@@ -79,12 +83,14 @@ class Food(Sprite):
         self.rect = rect
         self.spawned = True
         self.particles.spawn(self.rect)
-        pygame.time.set_timer(self.spawn_event, 0)
+        Timers.set_timer(self, self.spawn_event, 0)
 
+    @probe
     def update(self, time_delta):
         """ Updates the particle system of the Food. """
         self.particles.update(time_delta)
 
+    @probe
     def draw(self, screen):
         """
         Draws the Food to the screen only if spawned.
@@ -106,21 +112,37 @@ class Food(Sprite):
         # Trigger the destroy method of the particle system
         self.particles.destroy()
 
+    @property
+    def rect(self):
+        """ Returns the Rect of the Food (None if not spawned). """
+        return self._rect
+
+    @rect.setter
+    def rect(self, rect):
+        """
+        Sets the Rect of the Food and computes its bounds and territory
+        once. The rect is replaced on every spawn, it is never moved.
+        """
+        self._rect = rect
+        self._bounds = self._territory = None
+        if rect is not None:
+            bounds = rect.copy()
+            adjustment = self.SIZE // 4
+            bounds.topleft = (bounds.x + adjustment, bounds.y + adjustment)
+            bounds.size = (bounds.width - adjustment * 2,
+                           bounds.height - adjustment * 2)
+            territory = rect.copy()
+            territory.topleft = (rect.x - self.SIZE, rect.y - self.SIZE)
+            territory.size = (rect.width + self.SIZE * 2,
+                              rect.height + self.SIZE * 2)
+            self._bounds, self._territory = bounds, territory
+
     @property
     def bounds(self):
         """ Returns the reduced Rect object of the Food. """
-        rect = self.rect.copy()
-        adjustment = self.SIZE // 4
-        rect.topleft = (rect.x + adjustment, rect.y + adjustment)
-        rect.size = (rect.width - adjustment * 2, rect.height - adjustment * 2)
-        return rect
+        return self._bounds
 
     @property
     def territory(self):
         """ Returns the expanded rect area of the food for off limits area. """
-        if self.rect:
-            rect = self.rect.copy()
-            rect.topleft = (rect.x - self.SIZE, rect.y - self.SIZE)
-            rect.size = (rect.width + self.SIZE * 2,
-                         rect.height + self.SIZE * 2)
-            return rect
+        return self._territory
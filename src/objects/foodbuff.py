@@ -13,8 +13,11 @@ import random
 from src.objects.food import Food
 from src.objects.particles import ParticleSystem
 from src.config import Config
+from src.timers import Timers
+from src.tracer import probe
 
 
+@Config.bind(LIFETIME_CONSTANT="FOOD_BUFF_LIFETIME")
 class FoodBuff(Food):
 
     # Class Event Constant
@@ -40,8 +43,9 @@ class FoodBuff(Food):
         """ Triggers the timer for the Food Buff to spawn. """
         delay = random.randint(Config.FOOD_BUFF_MIN_DELAY,
                                Config.FOOD_BUFF_MAX_DELAY)
-        pygame.time.set_timer(self.SPAWN_FOOD_BUFF_EVENT, delay)
+        Timers.set_timer(self, self.SPAWN_FOOD_BUFF_EVENT, delay)
 
+    @probe
     def spawn(self, *, off_limits_rects):
         """
         Draw first the food buff image by calling the super class method.
@@ -51,6 +55,7 @@ class FoodBuff(Food):
         self.lifetime = self.LIFETIME_CONSTANT
         self.image.set_alpha(255)
 
+    @probe
     def update(self, time_delta):
         """
         This will reduce the lifetime of food buff and
@@ -0,0 +1,167 @@
+"""
+GlyphAtlas Class / HudCounter Class - glyphs.py
+-----------------------------------------------------------
+This module contains the GlyphAtlas Class that pre-renders
+every character of a GUI theme text style (font, colour and
+shadow) into a single atlas surface. Texts are then composed
+by blitting the glyphs instead of laying out the font again.
+The HudCounter Class is a GUI image that shows a value with
+the glyphs and only redraws when the displayed text changes.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import string
+import pygame
+import pygame_gui
+from src.config import Config
+
+
+class GlyphAtlas:
+
+    # Characters that are pre-rendered in every atlas (the others are
+    # rendered with the font the first time they are used)
+    CHARSET = string.digits + string.ascii_uppercase + " .:+-ms"
+
+    # Shared atlases for each theme block
+    _atlases = {}
+
+    def __init__(self, block_id):
+        """
+        Renders the characters with the font, colours and shadow size of
+        the given theme block into one surface and saves the area and
+        the advance width of each glyph.
+        """
+        style = Config.theme_block(block_id)
+        font, colours = style.get("font", {}), style.get("colours", {})
+        resource = font.get("regular_resource", {}).get("resource")
+        font_path = (Config.assets_path(f"fonts/{resource}")
+                     if resource else None)
+        font_obj = pygame.font.Font(font_path, int(font.get("size", 14)))
+        font_obj.set_bold(font.get("bold") == "1")
+        color = self.parse_colour(colours.get("normal_text", "white"))
+        shadow = self.parse_colour(colours.get("text_shadow", "black"))
+        self._font, self._color, self._shadow = font_obj, color, shadow
+        # Glyphs of the characters that are not in the atlas image
+        self._extra = {}
+        self.shadow_size = int(style.get("misc", {})
+                               .get("text_shadow_size", 0))
+        self.height = font_obj.get_height() + self.shadow_size * 2
+
+        # Render each glyph with its shadow side by side in the atlas
+        glyphs = [self._render_glyph(font_obj, char, color, shadow)
+                  for char in self.CHARSET]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        self.image = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        self._areas, self._advances, x = {}, {}, 0
+        for char, glyph in zip(self.CHARSET, glyphs):
+            self.image.blit(glyph, (x, 0))
+            self._areas[char] = pygame.Rect(x, 0, glyph.get_width(),
+                                            self.height)
+            self._advances[char] = glyph.get_width() - self.shadow_size * 2
+            x += glyph.get_width()
+
+    @classmethod
+    def get(cls, block_id):
+        """ Returns the shared atlas of the theme block. """
+        if block_id not in cls._atlases:
+            cls._atlases[block_id] = GlyphAtlas(block_id)
+        return cls._atlases[block_id]
+
+    @staticmethod
+    def parse_colour(value):
+        """ Converts a theme colour, including the short #rgb form. """
+        if value.startswith("#") and len(value) == 4:
+            value = "#" + "".join(digit * 2 for digit in value[1:])
+        return pygame.Color(value)
+
+    def _render_glyph(self, font, char, color, shadow):
+        """ Renders a single character with the shadow around it. """
+        size = self.shadow_size
+        text_img = font.render(char, True, color)
+        shadow_img = font.render(char, True, shadow)
+        glyph = pygame.Surface((text_img.get_width() + size * 2,
+                                self.height), pygame.SRCALPHA)
+        for dx in range(-size, size + 1):
+            for dy in range(-size, size + 1):
+                if dx or dy:
+                    glyph.blit(shadow_img, (size + dx, size + dy))
+        glyph.blit(text_img, (size, size))
+        return glyph
+
+    def _add_glyph(self, char):
+        """ Renders a character that is not in the atlas on its own. """
+        glyph = self._render_glyph(self._font, char, self._color,
+                                   self._shadow)
+        self._extra[char] = glyph
+        self._areas[char] = glyph.get_rect()
+        self._advances[char] = glyph.get_width() - self.shadow_size * 2
+
+    def width(self, text):
+        """ Returns the width in pixels of the composed text. """
+        for char in text:
+            if char not in self._advances:
+                self._add_glyph(char)
+        return (sum(self._advances[char] for char in text) +
+                self.shadow_size * 2)
+
+    def draw(self, surface, text, position):
+        """ Blits the glyphs of the text to the surface at the position. """
+        x, y = position
+        for char in text:
+            if char not in self._areas:
+                self._add_glyph(char)
+            surface.blit(self._extra.get(char, self.image), (x, y),
+                         self._areas[char])
+            x += self._advances[char]
+
+    def render(self, text):
+        """ Returns a new transparent surface with the composed text. """
+        surface = pygame.Surface((self.width(text), self.height),
+                                 pygame.SRCALPHA)
+        self.draw(surface, text, (0, 0))
+        return surface
+
+
+class HudCounter:
+
+    def __init__(self, *, relative_rect, container, object_id,
+                 text_format="{}", align="left"):
+        """
+        Creates the GUI image that shows the formatted value using the
+        glyph atlas of the theme block of the given object id.
+        """
+        self._atlas = GlyphAtlas.get(object_id)
+        self._format = text_format
+        self._align = align
+        self._text = None
+        self._surface = pygame.Surface(relative_rect.size, pygame.SRCALPHA)
+        self._image = pygame_gui.elements.UIImage(
+            relative_rect=relative_rect, image_surface=self._surface,
+            container=container
+        )
+
+    @property
+    def text(self):
+        """ Returns the currently displayed text. """
+        return self._text
+
+    def set_value(self, value):
+        """
+        Redraws the counter only if the displayed text has changed.
+        Returns True if it was redrawn.
+        """
+        text = self._format.format(value)
+        if text == self._text:
+            return False
+        self._text = text
+        # Align the composed text inside the GUI image
+        width, height = self._surface.get_size()
+        x = 0
+        if self._align == "center":
+            x = (width - self._atlas.width(text)) // 2
+        y = (height - self._atlas.height) // 2
+        self._surface.fill((0, 0, 0, 0))
+        self._atlas.draw(self._surface, text, (x, y))
+        self._image.set_image(self._surface)
+        return True
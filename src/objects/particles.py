@@ -4,7 +4,9 @@ Particle Class / ParticleSystem Class - particles.py
 These modules contains the Particle Class that is used
 to represent a single image particle that is respawned on
 a given area. It resizes the image from small to big and
-vice versa as it reaches its lifetime.
+vice versa as it reaches its lifetime. The resized image is
+only made when it is drawn on a surface, the TextureCanvas
+scales the texture of the image instead.
 The ParticleSystem Class is used to manage multiple
 particles.
 -----------------------------------------------------------
@@ -14,6 +16,11 @@ Author: Fidel Jesus O. Surtida I
 import pygame
 import random
 from enum import Enum
+from src.governor import QualityGovernor
+from src.interpolation import Interpolation
+from src.profiler import FrameProfiler
+from src.renderer import draw_sprite
+from src.tracer import probe
 
 
 class Particle:
@@ -38,8 +45,10 @@ class Particle:
         self.animation = animation
         # Internal variables for particle animation
         self._position = None
+        self._previous = None
         self._lifetimer = 0
         self._scaledimg = None
+        self._alpha = 255
         self._delay = 0
         self._stopping = False
         self._stopped = False
@@ -61,8 +70,8 @@ class Particle:
 
         self._position = pygame.Vector2(x, y)
         self.rect = pygame.Rect(x, y, 1, 1)
-        self._scaledimg = pygame.transform.scale(self.image, (1, 1))
-        self._scaledimg.set_alpha(255)
+        self._scaledimg = None
+        self._alpha = 255
         self._lifetimer = 0
         self._delay = random.random() * 1.2
 
@@ -72,6 +81,8 @@ class Particle:
         lifetime we should increase the size to max size. The second half
         will be used to reduce the size to 0.
         """
+        # Save the position before this tick for the interpolation
+        self._previous = Interpolation.previous(self.rect)
         # Update first the delay timer to prevent immediate spawn
         self._delay = max(0, self._delay - time_delta)
         if self._delay > 0 or self._stopped:
@@ -112,19 +123,28 @@ class Particle:
                 time_modifier = (self._lifetimer - halftime) / halftime
                 alpha = 160 - int(160 * time_modifier)
 
-        # Update the rect and resize the image based on determined size
+        # Update the rect and alpha, the image is resized when drawn
         self.rect = pygame.Rect(self._position.x - size // 2,
                                 (self._position.y - size // 2) - y_modifier,
                                 size, size)
-        self._scaledimg = pygame.transform.scale(self.image,
-                                                 self.rect.size)
-        self._scaledimg.set_alpha(alpha)
+        self._scaledimg = None
+        self._alpha = alpha
+
+    def _scaled_image(self):
+        """ Returns the image resized to the rect with the alpha (cached). """
+        if self._scaledimg is None:
+            self._scaledimg = pygame.transform.scale(self.image,
+                                                     self.rect.size)
+            self._scaledimg.set_alpha(self._alpha)
+        return self._scaledimg
 
     def draw(self, screen):
         """ Draws this particle if lifetime is greater than 0. """
         if not self._stopped:
             if self._delay <= 0 and self._lifetimer < self.lifetime:
-                screen.blit(self._scaledimg, self.rect)
+                position = Interpolation.position(self._previous, self.rect)
+                draw_sprite(screen, self.image, position, self.rect.size,
+                            alpha=self._alpha, fallback=self._scaled_image)
 
     def stop(self):
         """ Sets the flag to destroy this particle. """
@@ -150,19 +170,27 @@ class ParticleSystem:
         self._lifetime = lifetime
         self._count = count
 
+    @probe
     def spawn(self, area):
-        """ Initializes the particles based on the count. """
+        """
+        Initializes the particles based on the count. The count is
+        reduced by the quality governor on slow computers.
+        """
+        count = max(1, round(self._count * QualityGovernor.particles))
         self.particles = [Particle(image=self._image, spawn_rect=area,
                                    size=self._size, lifetime=self._lifetime,
                                    animation=self._animation)
-                          for _ in range(self._count)]
+                          for _ in range(count)]
 
+    @probe
     def update(self, time_delta):
         """ Updates each particle in this system. """
         if self.particles:
-            for particle in self.particles:
-                particle.update(time_delta)
+            with FrameProfiler.stage("particles"):
+                for particle in self.particles:
+                    particle.update(time_delta)
 
+    @probe
     def draw(self, screen):
         """ Draws each particle in this system. """
         if self.particles:
@@ -16,8 +16,11 @@ from src.objects.particles import Particle
 from src.objects.particles import ParticleSystem
 from src.objects.snake import Snake
 from src.config import Config
+from src.timers import Timers
+from src.tracer import probe
 
 
+@Config.bind(LIFETIME_CONSTANT="SLOWDOWN_LIFETIME")
 class SlowDown(FoodBuff):
 
     # Class Event Constant
@@ -46,8 +49,9 @@ class SlowDown(FoodBuff):
         """ Triggers the timer for the SpeedUp to spawn. """
         delay = random.randint(Config.SLOWDOWN_MIN_DELAY,
                                Config.SLOWDOWN_MAX_DELAY)
-        pygame.time.set_timer(self.SPAWN_SLOW_DOWN_EVENT, delay)
+        Timers.set_timer(self, self.SPAWN_SLOW_DOWN_EVENT, delay)
 
+    @probe
     def spawn_near_head(self, *, off_limits_rects, head):
         """
         This is a different version of the spawn from food class. It will
@@ -100,6 +104,6 @@ class SlowDown(FoodBuff):
             self.particles.spawn(self.rect)
             self.lifetime = self.LIFETIME_CONSTANT
             self.image.set_alpha(255)
-            pygame.time.set_timer(self.spawn_event, 0)
+            Timers.set_timer(self, self.spawn_event, 0)
         else:
             self._trigger_spawn()
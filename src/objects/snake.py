@@ -10,12 +10,19 @@ Author: Fidel Jesus O. Surtida I
 -----------------------------------------------------------
 """
 import pygame
-import pygame_gui
 import copy
+import itertools
+import operator
 from pygame.sprite import Sprite
 from src.config import Config
+from src.governor import QualityGovernor
+from src.interpolation import Interpolation
+from src.renderer import draw_sprite
+from src.tracer import probe
+from src.objects.glyphs import GlyphAtlas
 
 
+@Config.bind(LIFETIME="SNAKE_LIFETIME", BUFF_DURATION="BUFF_DURATION")
 class Snake:
 
     # Snake Settings from Config
@@ -32,11 +39,11 @@ class Snake:
     LEFT = pygame.Vector2(-SPEED, 0)
     RIGHT = pygame.Vector2(SPEED, 0)
 
-    def __init__(self, *, background=None, posx=512, posy=384):
+    def __init__(self, *, background=None, posx=512, posy=384, length=5):
         """
         Initialize a Snake object with a head and a list of body parts
         This will be placed in the center of screen with initial movement
-        of going up.
+        of going up. The length is the number of parts including the head.
         These also accepts a background image to be saved in order for
         the curve covers to completely hide the moving parts underneath.
         """
@@ -47,6 +54,8 @@ class Snake:
 
         # Snake Variables
         self._locked_direction = False
+        # Number of tiles reached by the head (each one is a turn chance)
+        self.tiles = 0
         self._head_index = 0
         self._time_frame = 0
         self.direction = Snake.UP
@@ -55,17 +64,22 @@ class Snake:
         self.body = []
         self.tails = []
         self.covers = []
+        self._rects = SnakeRects(self)
         self.lifetime = Snake.LIFETIME
         self.dead = False
         self.buff_icon = None
         self._old_tail_direction = None
         self._buff_duration = 0
+        self._buff_glyphs = GlyphAtlas.get("label")
         self._buff_counter = None
+        self._buff_text = None
+        self._buff_alpha = 255
         self._buff_rect = None
+        self._buff_text_rect = None
         self._damage_timer = 0
-        for i in range(1, 5):
+        for i in range(1, length):
             # Seperate the tail sprite into the last element
-            sprite = self._bodyimg if i < 4 else self._tailimg
+            sprite = self._bodyimg if i < length - 1 else self._tailimg
             self.body.append(SnakePart(posx, posy + Snake.SIZE * i,
                                        direction=Snake.UP, image=sprite))
 
@@ -113,6 +127,7 @@ class Snake:
                 self.head.next_movement(direction)
                 self._locked_direction = True
 
+    @probe
     def update(self, time_delta):
         """
         On every update, if a part has moved twice its size, it will return
@@ -125,6 +140,7 @@ class Snake:
         # Unlock the movement change if the head returned a direction
         if direction is not None:
             self._locked_direction = False
+            self.tiles += 1
         # Proceed to propagate the movement direction to the rest of body.
         for part in self.body:
             if direction:
@@ -152,7 +168,9 @@ class Snake:
 
         # Calls the helper method that creates the turn covers of the snake.
         # Updates the existing covers to reduce the delay counter.
-        self._create_turn_covers()
+        # The quality governor turns off the new covers on slow computers.
+        if QualityGovernor.turn_covers:
+            self._create_turn_covers()
         for cover in self.covers[:]:
             if cover.update(time_delta):
                 self.covers.remove(cover)
@@ -179,26 +197,35 @@ class Snake:
             # Update the alpha only in last 3 seconds of the buff duration
             if self._buff_duration <= 3:
                 alpha = max(0, int(self._buff_duration / 3 * 255))
-            self.buff_icon.set_alpha(alpha)
             # Create the Buff Rect as a reference for the Buff Counter
             self._buff_rect = self.head.rect.copy()
             self._buff_rect.move_ip(-5, -33)
             text_rect = self._buff_rect.copy()
             text_rect.move_ip(15, -5)
-            # Apply position to the buff counter label and set the alpha
-            self._buff_counter.set_position(text_rect)
-            self._buff_counter.set_text(f"{round(self._buff_duration):.0f}")
-            self._buff_counter.set_text_alpha(alpha)
+            # Redraw the buff counter only if the shown seconds changed
+            text = f"{round(self._buff_duration):.0f}"
+            if text != self._buff_text:
+                self._buff_text = text
+                self._buff_counter = self._buff_glyphs.render(text)
+                self._buff_counter.set_alpha(alpha)
+            self._buff_text_rect = self._buff_counter.get_rect(
+                center=text_rect.center)
+            # Apply the alpha to the icon and counter only if it changed
+            if alpha != self._buff_alpha:
+                self._buff_alpha = alpha
+                self.buff_icon.set_alpha(alpha)
+                self._buff_counter.set_alpha(alpha)
         # If buff duration reaches 0 then remove the buff icon
         elif self._buff_duration <= 0:
             # Reset the buff attributes and snake speed
             if self._buff_counter:
                 self.set_snake_speed(Config.SNAKE_SPEED)
-                self._buff_counter.kill()
                 self._buff_counter = None
+                self._buff_text = None
             self.buff_icon = None
             self._buff_rect = None
 
+    @probe
     def draw(self, screen):
         """ Draws the snake parts with body first then lastly the head. """
         # Draws the Body Parts first.
@@ -216,10 +243,12 @@ class Snake:
         # Lastly Draw the Head
         self.head.draw(screen)
 
-        # Draw the Buff Icon if there is a buff applied
+        # Draw the Buff Icon and Counter if there is a buff applied
         if not self.dead and self.buff_icon:
             screen.blit(self.buff_icon, self._buff_rect)
+            screen.blit(self._buff_counter, self._buff_text_rect)
 
+    @probe
     def _create_turn_covers(self):
         """
         Creates a SnakeCover object for each turning part of the snake.
@@ -240,8 +269,9 @@ class Snake:
 
         # Check first if subsequent parts collide with each other
         # Create a Snake Cover if it does not exist in covers list
-        for i in range(len(self.parts) - 1):
-            first, second = self.parts[i:i+2]
+        parts = self.parts
+        for i in range(len(parts) - 1):
+            first, second = parts[i:i+2]
             if first.bounds.colliderect(second.bounds):
                 cover_rect = second.future_bounds
                 existing = [c for c in self.covers if c.rect == cover_rect]
@@ -267,6 +297,7 @@ class Snake:
                 if existing:
                     existing[0].reset_delay()
 
+    @probe
     def grow(self):
         """
         To grow the snake, we need to copy the last part or the tail.
@@ -288,28 +319,31 @@ class Snake:
         Determine the effect based on the value of the buff and the
         name of the buff.
         """
+        # Only the speed buffs have an effect and a counter to show
+        if buff.name not in ("speedup", "slowdown"):
+            return
         self._buff_duration = self.BUFF_DURATION
-
-        if self._buff_counter:
-            self._buff_counter.kill()
-            self._buff_counter = None
+        self._buff_text = None
+        self._buff_alpha = 255
 
         if buff.name == "speedup":
             # Change the snake speed and constants
             self.set_snake_speed(buff.value)
-            # Set the icon and create the buff label counter
+            # Set the icon and create the buff counter image
             self.buff_icon = pygame.transform.scale(buff.image, (28, 28))
-            self._buff_counter = pygame_gui.elements.UILabel(
-                relative_rect=self.head.rect, text=f"{self.BUFF_DURATION}"
-            )
+            self.buff_icon.set_alpha(255)
+            self._buff_counter = self._buff_glyphs.render(
+                f"{self.BUFF_DURATION}")
         elif buff.name == "slowdown":
             # Change the snake speed and constants
             self.set_snake_speed(buff.value)
-            # Set the icon and create the buff label counter
+            # Set the icon and create the buff counter image
             self.buff_icon = pygame.transform.scale(buff.image, (28, 28))
-            self._buff_counter = pygame_gui.elements.UILabel(
-                relative_rect=self.head.rect, text=f"{self.BUFF_DURATION}"
-            )
+            self.buff_icon.set_alpha(255)
+            self._buff_counter = self._buff_glyphs.render(
+                f"{self.BUFF_DURATION}")
+        self._buff_text_rect = self._buff_counter.get_rect(
+            center=self.head.rect.center)
 
     def set_snake_speed(self, speed):
         """ Updates the speed of the Snake object and Class constants. """
@@ -317,11 +351,19 @@ class Snake:
         for part in self.parts:
             part.set_speed(speed)
         # Update the Snake class speed constants
-        Snake.SPEED = speed
-        Snake.UP = pygame.Vector2(0, -speed)
-        Snake.DOWN = pygame.Vector2(0, speed)
-        Snake.LEFT = pygame.Vector2(-speed, 0)
-        Snake.RIGHT = pygame.Vector2(speed, 0)
+        Snake.set_speed_constants(speed)
+
+    @classmethod
+    def set_speed_constants(cls, speed):
+        """
+        Updates the speed and movement class constants. This is also used
+        to restore the default speed before a new headless game.
+        """
+        cls.SPEED = speed
+        cls.UP = pygame.Vector2(0, -speed)
+        cls.DOWN = pygame.Vector2(0, speed)
+        cls.LEFT = pygame.Vector2(-speed, 0)
+        cls.RIGHT = pygame.Vector2(speed, 0)
 
     def trigger_damaged(self):
         """ Updates the snake parts to trigger the damaged sprite blend. """
@@ -334,7 +376,7 @@ class Snake:
         # Remove the buff counter if available
         if self._buff_counter:
             self.set_snake_speed(Config.SNAKE_SPEED)
-            self._buff_counter.kill()
+            self._buff_counter = None
 
     @property
     def parts(self):
@@ -343,8 +385,21 @@ class Snake:
 
     @property
     def rects(self):
-        """ Returns all the snake part rects including the head. """
-        return [part.bounds for part in self.parts]
+        """
+        Returns a read-only view of the snake part rects including the head.
+        The rects are the live rects of the parts, so they must not be moved.
+        """
+        return self._rects
+
+    @property
+    def can_turn(self):
+        """ Returns True if the next movement of the head can be changed. """
+        return not self._locked_direction
+
+    @property
+    def buff_left(self):
+        """ Returns the seconds left of the applied speed buff or debuff. """
+        return max(0, self._buff_duration)
 
     @property
     def stretch(self):
@@ -367,12 +422,15 @@ class SnakePart(Sprite):
                                         posy - Snake.SIZE // 2)
         self._next_direction = direction
         self._movement = direction
+        self._future_rect = None
+        self._previous = None
         self.rect = pygame.Rect(self._position.x, self._position.y,
                                 Snake.SIZE, Snake.SIZE)
         self._future_position = self.future_bounds.topleft
         # Save 2 images, the original _img is used for correctly rotating
         self.image = pygame.transform.scale(image, (Snake.SIZE, Snake.SIZE))
         self._img = image
+        self._angle = 0
         self._normalize_sprite()
 
     def next_movement(self, direction):
@@ -391,6 +449,8 @@ class SnakePart(Sprite):
         movement so that it will be passed to the next part in the list.
         Its next movement also will be set based on the passed velocity.
         """
+        # Save the position before this tick for the interpolation
+        self._previous = Interpolation.previous(self.rect)
         if (
             abs(self.rect.x - self._position.x) >= Snake.SIZE or
             abs(self.rect.y - self._position.y) >= Snake.SIZE
@@ -399,6 +459,7 @@ class SnakePart(Sprite):
             self._movement = self._next_direction
             self.rect.topleft = self._future_position
             self._position = pygame.Vector2(self.rect.x, self.rect.y)
+            self._future_rect = None
             self._future_position = self.future_bounds.topleft
             self.rect.move_ip(self._movement.x, self._movement.y)
             self._normalize_sprite()
@@ -406,17 +467,25 @@ class SnakePart(Sprite):
 
         self.rect.move_ip(self._movement.x, self._movement.y)
 
+    @property
+    def position(self):
+        """ Returns the position the part is drawn at (between ticks). """
+        return Interpolation.position(self._previous, self.rect)
+
     def draw(self, screen):
         """ Draw this individual part to the screen. """
+        position = self.position
         # If the flag is damaged then draw the part with a blend of red.
         if Snake.DAMAGED:
             image = self.image.copy()
             cmask = pygame.Surface(image.get_size()).convert_alpha()
             cmask.fill(pygame.Color(255, 0, 0, 255))
             image.blit(cmask, (0, 0), special_flags=pygame.BLENDMODE_BLEND)
-            screen.blit(image, self.rect)
+            screen.blit(image, position)
         else:
-            screen.blit(self.image, self.rect)
+            # The TextureCanvas rotates the texture of the original image
+            draw_sprite(screen, self._img, position, self.image.get_size(),
+                        angle=self._angle, fallback=self.image)
 
     def teleport(self, x, y, *, corner="topleft"):
         """ Teleports the position of this snake part. """
@@ -429,12 +498,14 @@ class SnakePart(Sprite):
     def set_speed(self, speed):
         """ Sets the new speed of the next direction and current movement. """
         self._movement = self._movement / Snake.SPEED * speed
+        self._future_rect = None
         self._next_direction = self._next_direction / Snake.SPEED * speed
 
     def stop(self):
         """ Stops the movement and next movement of this snake part. """
         self._movement = Snake.ZERO
         self._next_direction = Snake.ZERO
+        self._future_rect = None
 
     def change_sprite(self, sprite, direction=None):
         """ Updates the original image and the sprite image attribute. """
@@ -444,8 +515,11 @@ class SnakePart(Sprite):
 
     @property
     def bounds(self):
-        """ Returns the Rect or bounderies of this snake part. """
-        return self.rect.copy()
+        """
+        Returns the Rect or bounderies of this snake part. This is the live
+        rect of the part (not a copy), so it must only be read.
+        """
+        return self.rect
 
     @property
     def direction(self):
@@ -456,15 +530,20 @@ class SnakePart(Sprite):
     def direction(self, value):
         """ Sets the current movement of this snake part. """
         self._movement = value
+        self._future_rect = None
 
     @property
     def future_bounds(self):
         """
         Returns a Rect object of its future position based on movement.
         This will be used for generating the cover of the snake turn.
+        The Rect is cached until the position or movement changes.
         """
-        position = self._position + (self._movement / Snake.SPEED * Snake.SIZE)
-        return pygame.Rect(position, (Snake.SIZE, Snake.SIZE))
+        if self._future_rect is None:
+            position = self._position + (self._movement / Snake.SPEED *
+                                         Snake.SIZE)
+            self._future_rect = pygame.Rect(position, (Snake.SIZE, Snake.SIZE))
+        return self._future_rect
 
     def _normalize_sprite(self, direction=None):
         """ Rotates the sprite image based on the direction."""
@@ -479,6 +558,7 @@ class SnakePart(Sprite):
                           Snake.LEFT, Snake.RIGHT]
             degrees = [0, 0, 180, -90, 90][directions.index(index)]
             self.image = pygame.transform.rotate(self._img, degrees)
+            self._angle = degrees
 
 
 class SnakeCover:
@@ -527,3 +607,33 @@ class SnakeCover:
     def reset_delay(self):
         """ Resets the delay counter to its initial value. """
         self.delay = 0.07
+
+
+class SnakeRects:
+
+    _get_rect = operator.attrgetter("rect")
+
+    def __init__(self, snake):
+        """
+        Initializes a read-only view of the rects of the snake parts with
+        the head first. The rects are read from the parts each time, so the
+        view follows the snake as it grows without copying any Rect.
+        """
+        self._snake = snake
+
+    def __len__(self):
+        return len(self._snake.body) + 1
+
+    def __iter__(self):
+        return itertools.chain((self._snake.head.rect,),
+                               map(self._get_rect, self._snake.body))
+
+    def __getitem__(self, index):
+        """ Returns the rect of the part in the index (0 is the head). """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("snake part index out of range")
+        if index == 0:
+            return self._snake.head.rect
+        return self._snake.body[index - 1].rect
@@ -16,8 +16,10 @@ from src.objects.foodbuff import FoodBuff
 from src.objects.particles import Particle
 from src.objects.particles import ParticleSystem
 from src.config import Config
+from src.timers import Timers
 
 
+@Config.bind(LIFETIME_CONSTANT="SPEEDUP_LIFETIME")
 class SpeedUp(FoodBuff):
 
     # Class Event Constant
@@ -46,4 +48,4 @@ class SpeedUp(FoodBuff):
         """ Triggers the timer for the SpeedUp to spawn. """
         delay = random.randint(Config.SPEEDUP_MIN_DELAY,
                                Config.SPEEDUP_MAX_DELAY)
-        pygame.time.set_timer(self.SPAWN_SPEED_UP_EVENT, delay)
\ No newline at end of file
+        Timers.set_timer(self, self.SPAWN_SPEED_UP_EVENT, delay)
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Policy Classes - policy.py
+-----------------------------------------------------------
+This module contains the classes that let a bot policy
+play the game with the real rules. The Game calls the
+policy once for each tile the snake head reaches (the only
+time the snake can turn) and moves the snake in the
+direction it returns. The policy sees the game through an
+Observation: an occupancy grid of the tiles with a channel
+for the snake, its head, the foods, the items and the
+bombs, and a small array of values like the lifetime and
+the score. Both are NumPy arrays that are created once and
+filled again in place for every decision.
+    policy = GreedyPolicy()
+    policy.attach(game)
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import numpy as np
+from src.config import Config
+from src.objects.snake import Snake
+
+
+class Observation:
+
+    # Tile size of the grid and the channels of the occupancy grid
+    TILE = Config.SNAKE_SIZE
+    SNAKE, HEAD, FOOD, ITEM, BOMB = range(5)
+    # Names of the values (the head tile is the tile of the next turn)
+    FIELDS = ("lifetime", "score", "speed", "buff_left", "head_x", "head_y",
+              "direction_x", "direction_y")
+
+    def __init__(self, game):
+        """
+        Creates the arrays for the tiles inside the arena bounds of the
+        game. The tiles are aligned with the snake head position.
+        """
+        bounds = game.bounderies
+        x, y = game.snake.head.future_bounds.topleft
+        # Find the position of the first tile inside the bounds
+        self._left = bounds.left + (x - bounds.left) % self.TILE
+        self._top = bounds.top + (y - bounds.top) % self.TILE
+        columns = (bounds.right - self._left) // self.TILE
+        rows = (bounds.bottom - self._top) // self.TILE
+        self.grid = np.zeros((5, rows, columns), dtype=np.uint8)
+        self.values = np.zeros(len(self.FIELDS), dtype=np.float32)
+        self._index = {name: i for i, name in enumerate(self.FIELDS)}
+
+    def __getitem__(self, name):
+        """ Returns a value by its field name. """
+        return self.values[self._index[name]]
+
+    def tile(self, x, y):
+        """ Returns the (column, row) of the tile at the position. """
+        return (x - self._left) // self.TILE, (y - self._top) // self.TILE
+
+    def _mark(self, channel, rect, value=1):
+        """ Marks the tiles that the rect overlaps in the channel. """
+        rows, columns = self.grid.shape[1:]
+        left, top = self.tile(rect.left, rect.top)
+        right, bottom = self.tile(rect.right - 1, rect.bottom - 1)
+        left, top = max(0, left), max(0, top)
+        right, bottom = min(columns - 1, right), min(rows - 1, bottom)
+        if left <= right and top <= bottom:
+            self.grid[channel, top:bottom + 1, left:right + 1] = value
+
+    def update(self, game):
+        """
+        Fills the arrays again with the current state of the game.
+        Negative items (debuffs) are marked with 2 in the item channel.
+        """
+        self.grid.fill(0)
+        snake = game.snake
+        for rect in snake.rects:
+            self._mark(self.SNAKE, rect)
+        for food in game.foods:
+            if food.spawned:
+                self._mark(self.FOOD, food.bounds)
+        for item in game.items:
+            if item.spawned:
+                self._mark(self.ITEM, item.bounds, 2 if item.negative else 1)
+        for bomb in game.bombs:
+            if bomb.spawned and bomb.bounds:
+                self._mark(self.BOMB, bomb.bounds)
+
+        # The head is marked on the tile where it can turn next
+        head_x, head_y = self.tile(*snake.head.future_bounds.topleft)
+        self._mark(self.HEAD, snake.head.future_bounds)
+        # The direction is saved as a tile step (like 0, -1 for UP)
+        direction = snake.direction
+        speed = max(abs(direction.x), abs(direction.y)) or 1
+        self.values[:] = (snake.lifetime, game.score, Snake.SPEED,
+                          snake.buff_left, head_x, head_y,
+                          direction.x / speed, direction.y / speed)
+        return self
+
+
+class Policy:
+
+    # Tile steps and the name of their Snake direction (the directions
+    # are read each time since the speed buffs replace them)
+    STEPS = {(0, -1): "UP", (0, 1): "DOWN", (-1, 0): "LEFT", (1, 0): "RIGHT"}
+
+    def __init__(self):
+        """ Creates the policy, the observation is made when attached. """
+        self.observation = None
+
+    def attach(self, game):
+        """ Lets this policy play the given game (in the PLAY state). """
+        self.observation = Observation(game)
+        game.policy = self
+
+    def act(self, game):
+        """
+        Called by the Game when the snake can turn. Fills the observation
+        and returns the Snake direction of the policy (None to go on).
+        """
+        direction = self.decide(self.observation.update(game))
+        if direction is None:
+            return None
+        return getattr(Snake, self.STEPS[direction])
+
+    def decide(self, observation):
+        """
+        Returns the tile step (like (0, -1) for UP) that the snake takes
+        after its next tile, or None to keep the current direction.
+        """
+        raise NotImplementedError
+
+
+class GreedyPolicy(Policy):
+
+    def decide(self, observation):
+        """
+        Takes the free neighbor tile that is the nearest to a food, or
+        keeps going straight if there is no food. Tiles of the snake and
+        the bombs are never taken.
+        """
+        grid = observation.grid
+        rows, columns = grid.shape[1:]
+        x, y = int(observation["head_x"]), int(observation["head_y"])
+        forward = (int(observation["direction_x"]),
+                   int(observation["direction_y"]))
+        blocked = grid[Observation.SNAKE] | grid[Observation.BOMB]
+        foods = np.argwhere(grid[Observation.FOOD])
+
+        best, best_distance = None, None
+        for step in self.STEPS:
+            if step == (-forward[0], -forward[1]):
+                continue
+            column, row = x + step[0], y + step[1]
+            if not (0 <= column < columns and 0 <= row < rows):
+                continue
+            if blocked[row, column]:
+                continue
+            if len(foods):
+                distance = np.abs(foods - (row, column)).sum(axis=1).min()
+            else:
+                distance = 0 if step == forward else 1
+            if best is None or distance < best_distance:
+                best, best_distance = step, distance
+        return best
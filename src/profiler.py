@@ -0,0 +1,191 @@
+"""
+FrameProfiler Class - profiler.py
+-----------------------------------------------------------
+This module contains the FrameProfiler Class that measures
+how long each stage of a frame takes (events, spawns, snake,
+collisions, food, bombs, particles, drawing, GUI and flip).
+The spawns are timed inside the events and the particles
+inside the food, but the time of a nested stage is not
+counted again in the stage around it.
+When enabled with the F3 key, an overlay shows the rolling
+frame time percentiles, the time of each stage and a
+sparkline of the last few seconds of frames. When disabled
+every stage returns a shared empty context so the game loop
+only pays for one attribute check.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import time
+import contextlib
+import threading
+from collections import deque
+import pygame
+from src.config import Config
+
+
+# Stages that are being timed in each thread, the innermost last
+_running = threading.local()
+
+
+class _Stage:
+
+    __slots__ = ("_totals", "_name", "_start")
+
+    def __init__(self, totals, name):
+        """ Creates a reusable timer that adds to the frame totals. """
+        self._totals = totals
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        _running.__dict__.setdefault("stages", []).append(self)
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        self._totals[self._name] += elapsed
+        stages = _running.stages
+        stages.pop()
+        # Only the time outside the nested stages is kept for the parent
+        if stages:
+            self._totals[stages[-1]._name] -= elapsed
+
+
+class FrameProfiler:
+
+    # Measured stages in the order they are shown in the overlay
+    STAGES = ("events", "spawns", "snake", "collision", "food", "bombs",
+              "particles", "draw", "gui update", "gui draw", "flip")
+    # Number of frames kept and the frame budget in milliseconds
+    HISTORY = Config.PROFILER_HISTORY
+    BUDGET = 1000 / Config.FPS
+    # Overlay settings (text refresh in seconds and sizes in pixels)
+    TEXT_REFRESH = 0.25
+    POSITION = (35, 60)
+    WIDTH = 270
+    LINE_HEIGHT = 16
+    SPARK_HEIGHT = 40
+    COLUMNS = (8, 110, 165, 220)
+
+    # Profiler state shared by the whole game
+    enabled = False
+    _null_stage = contextlib.nullcontext()
+    _totals = {}
+    _stages = {}
+    _history = {}
+    _frames = deque()
+    _last_frame = None
+    _font = None
+    _panel = None
+    _panel_time = 0
+
+    @classmethod
+    def toggle(cls):
+        """ Turns the profiler on (with a new history) or off. """
+        cls.enabled = not cls.enabled
+        if cls.enabled:
+            cls._totals = dict.fromkeys(cls.STAGES, 0.0)
+            cls._stages = {name: _Stage(cls._totals, name)
+                           for name in cls.STAGES}
+            cls._history = {name: deque(maxlen=cls.HISTORY)
+                            for name in cls.STAGES}
+            cls._frames = deque(maxlen=cls.HISTORY)
+            cls._last_frame = None
+            cls._panel = None
+
+    @classmethod
+    def stage(cls, name):
+        """ Returns the context manager that times the given stage. """
+        if not cls.enabled:
+            return cls._null_stage
+        return cls._stages[name]
+
+    @classmethod
+    def end_frame(cls):
+        """
+        Saves the time since the previous frame and the time of each
+        stage in this frame, then resets the stage totals.
+        """
+        if not cls.enabled:
+            return
+        now = time.perf_counter()
+        if cls._last_frame is not None:
+            cls._frames.append((now - cls._last_frame) * 1000)
+            for name, total in cls._totals.items():
+                cls._history[name].append(total * 1000)
+        cls._last_frame = now
+        for name in cls._totals:
+            cls._totals[name] = 0.0
+
+    @staticmethod
+    def percentiles(values, *percents):
+        """ Returns the nearest rank percentiles of the values. """
+        ordered = sorted(values) or [0]
+        last = len(ordered) - 1
+        return [ordered[min(last, int(len(ordered) * p / 100))]
+                for p in percents]
+
+    @classmethod
+    def summary(cls):
+        """ Returns the p50, p95 and p99 of the frames and of each stage. """
+        summary = {"frame": cls.percentiles(cls._frames, 50, 95, 99)}
+        for name in cls.STAGES:
+            summary[name] = cls.percentiles(cls._history[name], 50, 95, 99)
+        return summary
+
+    @classmethod
+    def _render_panel(cls):
+        """ Renders the overlay text of the percentiles of each stage. """
+        if cls._font is None:
+            cls._font = pygame.font.Font(None, 20)
+        rows = len(cls.STAGES) + 2
+        height = rows * cls.LINE_HEIGHT + cls.SPARK_HEIGHT + 16
+        panel = pygame.Surface((cls.WIDTH, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+
+        def draw_row(row, cells, color="white"):
+            for x, cell in zip(cls.COLUMNS, cells):
+                text = cls._font.render(cell, True, color)
+                panel.blit(text, (x, 6 + row * cls.LINE_HEIGHT))
+
+        summary = cls.summary()
+        p50, p95, p99 = summary["frame"]
+        color = "white" if p95 <= cls.BUDGET else "orange"
+        draw_row(0, ("FRAME", f"{p50:.1f}", f"{p95:.1f}", f"{p99:.1f}"),
+                 color)
+        draw_row(1, ("ms", "p50", "p95", "p99"), "gray")
+        for row, name in enumerate(cls.STAGES, start=2):
+            draw_row(row, [name] + [f"{value:.2f}" for value in
+                                    summary[name]])
+        return panel
+
+    @classmethod
+    def draw(cls, screen):
+        """
+        Draws the overlay panel and the sparkline of the frame times.
+        The panel text is only rendered again every TEXT_REFRESH seconds.
+        """
+        if not cls.enabled:
+            return
+        now = time.perf_counter()
+        if cls._panel is None or now - cls._panel_time >= cls.TEXT_REFRESH:
+            cls._panel = cls._render_panel()
+            cls._panel_time = now
+        x, y = cls.POSITION
+        screen.blit(cls._panel, (x, y))
+
+        # Scale the frame times of the sparkline to twice the budget
+        spark = pygame.Rect(x + 8, y + cls._panel.get_height() -
+                            cls.SPARK_HEIGHT - 8, cls.WIDTH - 16,
+                            cls.SPARK_HEIGHT)
+        scale = spark.height / (cls.BUDGET * 2)
+        budget_y = spark.bottom - cls.BUDGET * scale
+        pygame.draw.line(screen, "gray", (spark.left, budget_y),
+                         (spark.right, budget_y))
+        if len(cls._frames) > 1:
+            step = spark.width / (cls.HISTORY - 1)
+            points = [(spark.left + i * step,
+                       spark.bottom - min(spark.height, frame * scale))
+                      for i, frame in enumerate(cls._frames)]
+            pygame.draw.lines(screen, "green", False, points)
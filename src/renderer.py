@@ -0,0 +1,171 @@
+"""
+TextureCanvas Class - renderer.py
+-----------------------------------------------------------
+This module contains the TextureCanvas Class, a render
+backend that draws the game with the SDL2 Renderer instead
+of software blits on the screen surface. Each image is
+uploaded to a Texture once, the first time it is drawn,
+and the rotation, scaling and alpha of the sprites are set
+on the texture when it is drawn instead of creating a new
+transformed surface every tick. The objects draw on the
+canvas like on the screen, with blit, and the sprites that
+are transformed use the draw_sprite function, which blits
+their transformed image on the other surfaces. The canvas
+uses the GPU if there is one, else the software renderer
+of SDL, so it also runs without a GPU.
+    python -m src.main --renderer gpu
+The GUI is still drawn by pygame_gui on a surface, which is
+uploaded as one overlay texture for each frame.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import weakref
+import pygame
+from pygame._sdl2.video import Renderer, Texture, Window
+from pygame._sdl2.video import error as SDLError
+
+
+def draw_sprite(surface, image, position, size, *, angle=0, alpha=None,
+                fallback):
+    """
+    Draws the image scaled to the size, rotated by the angle (in degrees
+    counterclockwise like transform.rotate, a multiple of 90) and with
+    the alpha, with its top left at the position. A TextureCanvas does
+    it with the texture of the image. The other surfaces blit the
+    fallback, the already transformed image, or the image returned by
+    the fallback if it is a function, so it is only made when needed.
+    """
+    draw = getattr(surface, "draw_sprite", None)
+    if draw is not None:
+        draw(image, position, size, angle=angle, alpha=alpha,
+             fallback=fallback)
+        return
+    if callable(fallback):
+        fallback = fallback()
+    surface.blit(fallback, position)
+
+
+class TextureCanvas:
+
+    def __init__(self, title, size, *, vsync=False):
+        """
+        Creates the window and its renderer. The hardware renderer is
+        used if it can be created, else the software renderer of SDL.
+        The display module must already have a (hidden) mode set, since
+        the images are still converted to its format when loaded.
+        """
+        self.window = Window(title, size)
+        self.accelerated = True
+        try:
+            self.renderer = Renderer(self.window, accelerated=1,
+                                     vsync=vsync)
+        except (pygame.error, SDLError):
+            self.accelerated = False
+            self.renderer = Renderer(self.window, accelerated=0,
+                                     vsync=vsync)
+        self._size = tuple(size)
+        # Textures of the uploaded images, removed with their images
+        self._textures = weakref.WeakKeyDictionary()
+        self.uploads = 0
+        # The GUI is drawn on the overlay and streamed to its texture
+        self._overlay = pygame.Surface(size, pygame.SRCALPHA)
+        self._overlay_texture = Texture(self.renderer, size, streaming=True)
+        self._overlay_texture.blend_mode = pygame.BLENDMODE_BLEND
+
+    def texture(self, image):
+        """
+        Returns the texture of the image, it is uploaded the first time.
+        The images must not be drawn on after they are first drawn here,
+        the objects replace their images instead (like the DisplayList).
+        """
+        texture = self._textures.get(image)
+        if texture is None:
+            texture = Texture.from_surface(self.renderer, image)
+            # Blend the opaque images too, so their alpha can be set
+            texture.blend_mode = pygame.BLENDMODE_BLEND
+            self._textures[image] = texture
+            self.uploads += 1
+        return texture
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Draws the source like Surface.blit. The alpha of the source
+        surface is applied as the alpha of its texture. The special
+        flags are not supported and are ignored.
+        """
+        # An empty surface (like a particle of size 0) can not be a texture
+        if not source.get_width() or not source.get_height():
+            return
+        texture = self.texture(source)
+        alpha = source.get_alpha()
+        texture.alpha = 255 if alpha is None else alpha
+        if area is None:
+            width, height = source.get_size()
+        else:
+            area = pygame.Rect(area)
+            width, height = area.size
+        texture.draw(srcrect=area,
+                     dstrect=pygame.FRect(dest[0], dest[1], width, height))
+
+    def blits(self, blit_sequence, doreturn=False):
+        """ Draws each (source, dest, area, special_flags) of the sequence. """
+        for blit in blit_sequence:
+            self.blit(*blit)
+
+    def draw_sprite(self, image, position, size, *, angle=0, alpha=None,
+                    fallback=None):
+        """
+        Draws the texture of the image rotated, scaled and with the alpha
+        of the texture settings. The fallback is not needed here.
+        """
+        texture = self.texture(image)
+        texture.alpha = 255 if alpha is None else alpha
+        width, height = size
+        # The rotated size is given, the texture is scaled unrotated
+        if angle % 180:
+            width, height = height, width
+        texture.draw(dstrect=pygame.FRect(
+            position[0] + (size[0] - width) / 2,
+            position[1] + (size[1] - height) / 2, width, height),
+            angle=-angle)
+
+    def draw_overlay(self, *draws):
+        """
+        Clears the overlay surface, calls each draw function with it (for
+        the GUI) and draws the overlay texture over the frame.
+        """
+        self._overlay.fill((0, 0, 0, 0))
+        for draw in draws:
+            draw(self._overlay)
+        self._overlay_texture.update(self._overlay)
+        self._overlay_texture.draw()
+
+    def fill(self, color):
+        """ Clears the whole frame with the color. """
+        self.renderer.draw_color = color
+        self.renderer.clear()
+
+    def subsurface(self, rect):
+        """
+        Returns a new surface with the pixels of the rect of the frame
+        drawn so far. Unlike Surface.subsurface it is a copy, so it is
+        only used to read the frame (the deathcam and the capture).
+        """
+        return self.renderer.to_surface(area=pygame.Rect(rect))
+
+    def present(self):
+        """ Shows the drawn frame in the window. """
+        self.renderer.present()
+
+    def get_size(self):
+        return self._size
+
+    def get_width(self):
+        return self._size[0]
+
+    def get_height(self):
+        return self._size[1]
+
+    def get_rect(self):
+        return pygame.Rect((0, 0), self._size)
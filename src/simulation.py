@@ -0,0 +1,168 @@
+"""
+Simulation Class - simulation.py
+-----------------------------------------------------------
+This module contains the Simulation Class that runs the
+game updates (movement, collisions, spawns and timers) on
+a worker thread at a fixed tick rate. The main thread
+still handles the pygame events and the GUI, and draws
+each frame from the last snapshot of the game, which is a
+DisplayList of the blits that the worker records at the
+end of each tick. A slow display flip, GUI rebuild or draw
+no longer slows down the snake, and a slow tick does not
+freeze the input. The main thread only holds the lock of
+the simulation to handle the events that change the game,
+and the GUI changes of the ticks are queued by the
+Interface and run on the main thread.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import threading
+import time
+from src.config import Config
+from src.interpolation import Interpolation
+
+
+class DisplayList:
+
+    def __init__(self):
+        """
+        Creates an empty list of blits. This is passed to the draw
+        methods instead of the screen, so a frame can be recorded by the
+        simulation thread and drawn later without touching the game.
+        """
+        self._blits = []
+        self._alphas = []
+        # Head position and time for the deathcam, taken with the frame
+        self.deathcam = None
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Records a blit like Surface.blit. The destination is saved as
+        a new position since the rects of the game objects are moved in
+        place. The source surfaces are saved as they are, the objects
+        replace their images instead of drawing on them. Only their
+        alpha is changed in place, so it is saved with the blit.
+        """
+        self._blits.append((source, (dest[0], dest[1]), area, special_flags))
+        self._alphas.append(source.get_alpha())
+
+    def replay(self, surface):
+        """
+        Draws the recorded blits on the surface in the same order. If
+        the simulation has changed the alpha of a source since it was
+        recorded, a copy with the recorded alpha is drawn instead, so
+        the surfaces of the game are never changed here.
+        """
+        blits = self._blits
+        changed = [index for index, (blit, alpha) in
+                   enumerate(zip(blits, self._alphas))
+                   if blit[0].get_alpha() != alpha]
+        if changed:
+            blits = list(blits)
+            for index in changed:
+                source, *rest = blits[index]
+                source = source.copy()
+                source.set_alpha(self._alphas[index])
+                blits[index] = (source, *rest)
+        surface.blits(blits, doreturn=False)
+
+    def __len__(self):
+        return len(self._blits)
+
+
+class Simulation:
+
+    # Fixed time of each tick and the most time it can fall behind
+    TICK = 1 / Config.SIM_TICK_RATE
+    MAX_LAG = Config.SIM_MAX_LAG
+
+    def __init__(self, game):
+        """
+        Creates the worker thread that updates the given game every tick.
+        The lock must be held by the main thread when it handles the
+        events, since they change the game objects. This must be called
+        from the main thread, which becomes the only one to use the GUI.
+        """
+        self.game = game
+        self.lock = threading.Lock()
+        self.ticks = 0
+        self.error = None
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="simulation",
+                                        daemon=True)
+        # The updates read the screen for the gameover moments image
+        game.screen_lock = threading.Lock()
+        # The GUI changes of the ticks are run by the main thread
+        game.interface.defer_gui_calls()
+        # Last recorded frame, only replaced while holding its own lock
+        self._frame_lock = threading.Lock()
+        self._frame = self._record()
+
+    def start(self):
+        """ Starts the ticks of the worker thread. """
+        self._thread.start()
+
+    def _run(self):
+        """
+        Updates the game every tick. If the ticks fall behind by more
+        than MAX_LAG seconds, the missed ticks are skipped instead of
+        running them all at once.
+        """
+        next_tick = time.perf_counter()
+        try:
+            while not self._stopping.is_set():
+                with self.lock:
+                    # Check again since the main thread may have stopped it
+                    if self._stopping.is_set():
+                        break
+                    self.game.update(self.TICK)
+                    self.ticks += 1
+                    frame = self._record()
+                with self._frame_lock:
+                    self._frame = frame
+                next_tick += self.TICK
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    self._stopping.wait(delay)
+                elif delay < -self.MAX_LAG:
+                    next_tick = time.perf_counter()
+        except Exception as error:
+            self.error = error
+
+    def _record(self):
+        """
+        Records the draw calls of the game into a new DisplayList with
+        the head for the deathcam. The objects are drawn at the position
+        of the last tick, since the frame may be shown at any time until
+        the next one.
+        """
+        Interpolation.alpha = 1.0
+        frame = DisplayList()
+        self.game.draw(frame)
+        frame.deathcam = self.game.deathcam_target()
+        return frame
+
+    def snapshot(self):
+        """
+        Returns the frame recorded at the end of the last tick. It does
+        not wait for a tick, the lock of the frame is only held to swap
+        in the next frame.
+        """
+        if self.error:
+            raise RuntimeError("The simulation thread stopped") from self.error
+        with self._frame_lock:
+            return self._frame
+
+    def stop(self):
+        """
+        Stops the ticks without waiting for the thread. This can be
+        called with the lock held (when the QUIT event is handled).
+        """
+        self._stopping.set()
+
+    def close(self):
+        """ Stops the ticks and waits for the worker thread to end. """
+        self.stop()
+        if self._thread.is_alive():
+            self._thread.join()
@@ -0,0 +1,56 @@
+"""
+Timers Class - timers.py
+-----------------------------------------------------------
+This module contains the Timers Class that works like the
+pygame.time.set_timer function, but each game object has
+its own timer and the time only passes when the game is
+updated. When a timer ends, an event of the given type is
+posted with the owner object, then the timer starts again
+until it is cancelled (just like the pygame timers).
+This allows many objects of the same class to spawn on
+their own, and the same updates always spawn the same way.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import weakref
+import pygame
+
+
+class Timers:
+
+    # Timer of each owner object: [event type, delay, time left]
+    _timers = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def set_timer(cls, owner, event_type, millis):
+        """
+        Starts the timer of the owner object with the delay in
+        milliseconds. A delay of 0 cancels the timer of the owner.
+        """
+        if millis <= 0:
+            cls._timers.pop(owner, None)
+        else:
+            cls._timers[owner] = [event_type, millis / 1000, millis / 1000]
+
+    @classmethod
+    def update(cls, time_delta):
+        """ Reduces each timer and posts the events of the ended timers. """
+        for owner, timer in list(cls._timers.items()):
+            timer[2] -= time_delta
+            if timer[2] <= 0:
+                timer[2] += timer[1]
+                pygame.event.post(pygame.event.Event(timer[0], owner=owner))
+
+    @classmethod
+    def clear(cls, owners=None):
+        """
+        Cancels the timers of the given owner objects, or the timers of
+        every object if no owners are given. The timers are shared by
+        every game in the process, so a game only cancels its own.
+        """
+        if owners is None:
+            cls._timers.clear()
+            return
+        for owner in owners:
+            cls._timers.pop(owner, None)
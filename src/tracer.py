@@ -0,0 +1,113 @@
+"""
+Tracer Class - tracer.py
+-----------------------------------------------------------
+This module contains the probe decorator and the Tracer
+Class that records every call of the probed functions as
+a Chrome trace event. The saved JSON file can be opened in
+chrome://tracing or ui.perfetto.dev to see each frame and
+the spikes of the game on a timeline.
+The probe decorator only tags the function and returns it
+unchanged, so the probes cost nothing unless the tracer is
+installed with the --trace command line flag. Only the
+newest TRACE_MAX_EVENTS calls are kept, so a long session
+does not grow the memory without a limit.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from src.config import Config
+
+
+def probe(func=None, *, name=None):
+    """
+    Tags a function or method as a trace probe. The event name is the
+    qualified name of the function unless a name is given.
+    """
+    def tag(func):
+        func.__trace_name__ = name or func.__qualname__
+        Tracer.PROBES.append(func)
+        return func
+    return tag(func) if func else tag
+
+
+class Tracer:
+
+    # Every function tagged with the probe decorator
+    PROBES = []
+    # Most events kept, the oldest events are dropped after that
+    MAX_EVENTS = Config.TRACE_MAX_EVENTS
+
+    # Tracer state while it is installed
+    path = None
+    _events = deque()
+    _threads = {}
+    _start = 0
+
+    @classmethod
+    def install(cls, path):
+        """
+        Replaces every probed function in its class or module with a
+        wrapper that records the start time and duration of each call.
+        The trace is written to the given path when saved.
+        """
+        cls.path = Path(path)
+        cls._start = time.perf_counter()
+        cls._events = deque(maxlen=cls.MAX_EVENTS)
+        for func in cls.PROBES:
+            owner = sys.modules[func.__module__]
+            *parents, attr = func.__qualname__.split(".")
+            for parent in parents:
+                owner = getattr(owner, parent)
+            original = owner.__dict__[attr]
+            # Keep the static and class methods as they are declared
+            if isinstance(original, (staticmethod, classmethod)):
+                wrapped = type(original)(cls._wrap(original.__func__))
+            else:
+                wrapped = cls._wrap(original)
+            setattr(owner, attr, wrapped)
+
+    @classmethod
+    def _wrap(cls, func):
+        """ Returns the wrapper that records each call of the function. """
+        name = func.__trace_name__
+        events, threads = cls._events, cls._threads
+        clock, get_ident = time.perf_counter, threading.get_ident
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tid = get_ident()
+                events.append((name, start, clock() - start, tid))
+                if tid not in threads:
+                    threads[tid] = threading.current_thread().name
+        return wrapper
+
+    @classmethod
+    def save(cls):
+        """ Writes the recorded events as a Chrome trace JSON file. """
+        if cls.path is None:
+            return
+        pid = os.getpid()
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                  "args": {"name": thread_name}}
+                 for tid, thread_name in cls._threads.items()]
+        # Timestamps and durations of the trace format are microseconds
+        trace += [{"name": name, "cat": "game", "ph": "X", "pid": pid,
+                   "tid": tid, "ts": round((start - cls._start) * 1e6, 3),
+                   "dur": round(duration * 1e6, 3)}
+                  for name, start, duration, tid in cls._events]
+        cls.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cls.path, "w") as trace_file:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"},
+                      trace_file)
@@ -0,0 +1,141 @@
+"""
+FrameWatchdog Class - watchdog.py
+-----------------------------------------------------------
+This module contains the FrameWatchdog Class that notices
+the frames of the game loop that go over the frame budget.
+A helper thread waits until the budget of the current frame
+has passed and if the frame is still running, it samples
+the Python stack of the main thread. When the frame ends,
+the samples are written to a rotating log file together
+with the game context (state, snake length, bombs, etc.),
+so rare hitches in the field can be found without running
+a profiler the whole time.
+-----------------------------------------------------------
+Author: Fidel Jesus O. Surtida I
+-----------------------------------------------------------
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from src.config import Config
+
+
+class FrameWatchdog:
+
+    # Seconds between the stack samples of an over budget frame
+    SAMPLE_INTERVAL = 0.005
+    MAX_SAMPLES = 8
+    # Rotating log file settings
+    LOG_SIZE = Config.WATCHDOG_LOG_SIZE
+    LOG_BACKUPS = Config.WATCHDOG_LOG_BACKUPS
+
+    def __init__(self, path, *, budget=Config.WATCHDOG_BUDGET, context=None):
+        """
+        Creates the rotating log in the given path and starts the helper
+        thread that watches the frames of the thread creating this object.
+        The budget is in milliseconds and context is a function that
+        returns a dict of the game values written with each hitch.
+        """
+        self.budget = budget / 1000
+        self._context = context
+        self._main_ident = threading.get_ident()
+        self._lock = threading.Lock()
+        self._frame_started = threading.Event()
+        self._frame = 0
+        self._frame_start = None
+        self._samples = []
+        self.hitches = 0
+        # Each watchdog writes to its own logger and log file
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.setLevel(logging.WARNING)
+        self._logger.propagate = False
+        self._handler = RotatingFileHandler(path, maxBytes=self.LOG_SIZE,
+                                            backupCount=self.LOG_BACKUPS)
+        self._handler.setFormatter(logging.Formatter("%(asctime)s "
+                                                     "%(message)s"))
+        self._logger.addHandler(self._handler)
+        # Start the helper thread that samples the main thread stack
+        self._running = True
+        self._thread = threading.Thread(target=self._watch,
+                                        name="frame-watchdog", daemon=True)
+        self._thread.start()
+
+    def frame_start(self):
+        """ Marks the start of a frame and wakes up the helper thread. """
+        with self._lock:
+            self._frame += 1
+            self._frame_start = time.perf_counter()
+            self._samples = []
+        self._frame_started.set()
+
+    def frame_end(self):
+        """ Marks the end of a frame and logs it if it was over budget. """
+        end = time.perf_counter()
+        with self._lock:
+            start, samples = self._frame_start, self._samples
+            self._frame_start = None
+        if start is not None and end - start > self.budget:
+            self._log_hitch((end - start) * 1000, samples)
+
+    def _watch(self):
+        """
+        Runs in the helper thread. Sleeps until the budget of the frame
+        has passed, then samples the main thread stack a few times while
+        the same frame is still running.
+        """
+        while self._running:
+            self._frame_started.wait()
+            self._frame_started.clear()
+            with self._lock:
+                frame, start = self._frame, self._frame_start
+            if start is None:
+                continue
+            time.sleep(max(0.0, start + self.budget - time.perf_counter()))
+            for _ in range(self.MAX_SAMPLES):
+                with self._lock:
+                    if self._frame != frame or self._frame_start is None:
+                        break
+                    stack = sys._current_frames().get(self._main_ident)
+                    if stack is None:
+                        break
+                    elapsed = (time.perf_counter() - start) * 1000
+                    self._samples.append(
+                        (elapsed, traceback.format_stack(stack))
+                    )
+                time.sleep(self.SAMPLE_INTERVAL)
+
+    def _log_hitch(self, duration, samples):
+        """ Writes the frame time, game context and stack samples. """
+        self.hitches += 1
+        lines = [f"Frame {self._frame} took {duration:.1f} ms "
+                 f"(budget {self.budget * 1000:.1f} ms)"]
+        if self._context:
+            context = self._context()
+            lines.append(" ".join(f"{key}={value}"
+                                  for key, value in context.items()))
+        # Merge the same stacks that were sampled one after the other
+        previous, count = None, 0
+        for elapsed, stack in samples + [(None, None)]:
+            if stack == previous:
+                count += 1
+                continue
+            if previous is not None:
+                lines.append(f"Stack at {first:.1f} ms (x{count}):")
+                lines.append("".join(previous).rstrip())
+            previous, first, count = stack, elapsed, 1
+        if not samples:
+            lines.append("No stack sampled (frame ended before sampling)")
+        self._logger.warning("\n".join(lines))
+
+    def close(self):
+        """ Stops the helper thread and closes the log file. """
+        self._running = False
+        self._frame_started.set()
+        self._thread.join()
+        self._logger.removeHandler(self._handler)
+        self._handler.close()